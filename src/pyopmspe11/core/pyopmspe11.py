@@ -1,14 +1,18 @@
 # SPDX-FileCopyrightText: 2023 NORCE
 # SPDX-License-Identifier: MIT
+# pylint: disable=R0912, R0915
 
 """Main script for pyopmspe11"""
 import os
 import argparse
 from pyopmspe11.utils.inputvalues import process_input, check_deck, handle_tuning
-from pyopmspe11.utils.runs import simulations, plotting, data
+from pyopmspe11.utils.runs import simulations, plotting, data, follow, resume
 from pyopmspe11.visualization.plotting import plot_results
-from pyopmspe11.utils.writefile import opm_files, initial
+from pyopmspe11.utils.writefile import opm_files
 from pyopmspe11.utils.mapproperties import grid, positions
+from pyopmspe11.utils.timings import timer, write_timings
+from pyopmspe11.utils.sweep import sweep
+from pyopmspe11.utils.autotune import autotune
 
 
 def pyopmspe11():
@@ -20,6 +24,9 @@ def pyopmspe11():
     dic["exe"] = os.getcwd()  # Path to the folder of the input.txt file
     dic["mode"] = cmdargs["mode"].strip()  # Parts of the workflow to run
     dic["pat"] = os.path.dirname(__file__)[:-5]  # Path to the pyopmspe11 folder
+    dic["cache"] = os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "pyopmspe11"
+    )  # Path to the folder with the cached preprocessed files
     dic["compare"] = cmdargs["compare"].strip()  # Make common figures for comparison
     dic["use"] = cmdargs["use"].strip()  # OPM or resdata python package
     dic["resolution"] = cmdargs[
@@ -29,17 +36,35 @@ def pyopmspe11():
     dic["dt_data"] = float(
         cmdargs["write"].strip()
     )  # Temporal resolution to write the sparse and performance data
+    dic["binary"] = int(cmdargs["binary"])  # Binary IMPORT files for grid/properties
+    dic["text"] = int(cmdargs["text"])  # Text files for the cell centers/corners
+    dic["jobs"] = max(1, int(cmdargs["jobs"]))  # Processes to write the ZCORN values
+    dic["profile"] = (
+        f"{dic['exe']}/{dic['fol']}/profiles" if int(cmdargs["profile"]) else ""
+    )  # Folder for the cProfile files of the stages
+    dic["cores"] = (
+        int(cmdargs["cores"]) or os.cpu_count()
+    )  # Cores for the sweeps/trials
+    dic["follow"] = float(cmdargs["follow"])  # Seconds between checks of the run
+    dic["equilibration"] = int(cmdargs["equilibration"])  # Restart after no injection
+    dic["resume"] = int(cmdargs["resume"])  # Continue an interrupted simulation
+    dic["monitor"] = float(cmdargs["monitor"])  # Seconds between progress updates
+    dic["autotune"] = float(cmdargs["autotune"])  # Injection time of the trial runs
     # If the compare plots are generated, then we exit right afterwards
     if dic["compare"]:
         plot_results(dic)
         return
+    # If several configuration files are given, then each one runs in a sub-folder
+    if "," in file or "*" in file:
+        sweep(dic, file.split(","))
+        return
 
     # Process the input file (open pyopmspe11.utils.inputvalues to see the abbreviations meaning)
-    process_input(dic, file)
+    with timer(dic, "process_input"):
+        process_input(dic, file)
 
     # Make the output folders
-    if not os.path.exists(f"{dic['exe']}/{dic['fol']}"):
-        os.system(f"mkdir {dic['exe']}/{dic['fol']}")
+    os.makedirs(f"{dic['exe']}/{dic['fol']}", exist_ok=True)
     for fil in ["deck", "flow"]:
         if not os.path.exists(f"{dic['exe']}/{dic['fol']}/{fil}"):
             os.system(f"mkdir {dic['exe']}/{dic['fol']}/{fil}")
@@ -47,36 +72,64 @@ def pyopmspe11():
 
     if dic["mode"] == "all" or "deck" in dic["mode"]:
         # Initialize the grid
-        grid(dic)
-        # For corner-point grids, get the cell centers by executing flow
-        if dic["grid"] == "corner-point":
-            initial(dic)
-            os.chdir(f"{dic['exe']}/{dic['fol']}/deck")
-            simulations(dic, "INITIAL", "flow")
-            print("Files used to generate the corner-point grid (INITIAL.* files)")
+        with timer(dic, "grid"):
+            grid(dic)
         # Check the generated deck, flow version, and chosen co2store implementation
-        check_deck(dic)
+        with timer(dic, "check_deck"):
+            check_deck(dic)
         # Handle tuning
         handle_tuning(dic)
         # Get the sand and well/sources positions
-        positions(dic)
+        with timer(dic, "positions"):
+            positions(dic)
         # Write used opm related files
-        opm_files(dic)
-    if dic["mode"] == "all" or "flow" in dic["mode"]:
-        # Run the simulations
-        simulations(dic, dic["fol"].upper(), "flow")
-
-    if dic["mode"] == "all" or "data" in dic["mode"]:
-        # Write the data
+        with timer(dic, "opm_files"):
+            opm_files(dic)
+        if dic["autotune"]:
+            # Run short trials of candidate flags and use the best ones in the deck
+            with timer(dic, "autotune"):
+                autotune(dic, os.path.join(dic["exe"], file))
+    if dic["follow"] and (
+        dic["mode"] == "all" or ("flow" in dic["mode"] and "data" in dic["mode"])
+    ):
+        # Run the simulations and write the data of the finished report steps
         if not os.path.exists(f"{dic['exe']}/{dic['fol']}/data"):
             os.system(f"mkdir {dic['exe']}/{dic['fol']}/data")
-        data(dic)
+        with timer(dic, "simulations"):
+            follow(dic, dic["fol"].upper(), "flow")
+    else:
+        if dic["mode"] == "all" or "flow" in dic["mode"]:
+            # Run the simulations
+            with timer(dic, "simulations"):
+                if dic["resume"]:
+                    resume(dic, dic["fol"].upper(), "flow")
+                else:
+                    simulations(dic, dic["fol"].upper(), "flow")
+
+        if dic["mode"] == "all" or "data" in dic["mode"]:
+            # Write the data
+            if not os.path.exists(f"{dic['exe']}/{dic['fol']}/data"):
+                os.system(f"mkdir {dic['exe']}/{dic['fol']}/data")
+            with timer(dic, "data"):
+                data(dic)
 
     if dic["mode"] == "all" or "plot" in dic["mode"]:
         # Make some useful plots after the studies
         if not os.path.exists(f"{dic['exe']}/{dic['fol']}/figures"):
             os.system(f"mkdir {dic['exe']}/{dic['fol']}/figures")
-        plotting(dic)
+        with timer(dic, "plotting"):
+            plotting(dic)
+
+    # Write the wall/CPU times and peak memory of the stages
+    write_timings(
+        dic,
+        f"{dic['exe']}/{dic['fol']}/timings.json",
+        (
+            {"data": f"{dic['exe']}/{dic['fol']}/data/timings.json"}
+            if dic["mode"] == "all" or "data" in dic["mode"]
+            else None
+        ),
+    )
 
 
 def load_parser():
@@ -150,6 +203,86 @@ def load_parser():
         help="Time interval for the sparse and performance data (spe11a [h]; spe11b/c [y]) "
         "('0.1' by default).",
     )
+    parser.add_argument(
+        "-b",
+        "--binary",
+        default="0",
+        help="Write the grid and property keywords as binary files included in the "
+        "deck with the IMPORT keyword ('1') or as text files ('0') ('0' by default).",
+    )
+    parser.add_argument(
+        "-x",
+        "--text",
+        default="0",
+        help="Write also the cell centers and corners for the data postprocessing as "
+        "text files ('1'), besides the .npy files ('0' by default).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default="1",
+        help="Number of processes to write the corner depths (ZCORN) of the spe11c "
+        "grids in parallel ('1' by default).",
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        default="0",
+        help="Profile the stages, including the data and plotting scripts, with "
+        "cProfile and write the .pstats and collapsed-stack files in the profiles "
+        "folder ('1') ('0' by default).",
+    )
+    parser.add_argument(
+        "-n",
+        "--cores",
+        default="0",
+        help="Number of cores to run the stages of several configuration files "
+        "(given in -i separated by commas or as a glob pattern), or the trials of "
+        "-a, concurrently, "
+        "where the Flow runs take the cores after mpirun -np ('0' by default, i.e., "
+        "all cores).",
+    )
+    parser.add_argument(
+        "-f",
+        "--follow",
+        default="0",
+        help="Write the data of the finished report steps while Flow is running, "
+        "checking for new ones every given seconds, in the modes with flow and data "
+        "('0' by default, i.e., the data are written after the simulation).",
+    )
+    parser.add_argument(
+        "-e",
+        "--equilibration",
+        default="0",
+        help="Simulate the initial no-injection period once per grid, properties, and "
+        "thermal setup, caching its restart file, and start the simulations from it "
+        "('1') ('0' by default).",
+    )
+    parser.add_argument(
+        "-s",
+        "--resume",
+        default="0",
+        help="Continue an interrupted simulation from the last complete report step "
+        "in its restart file, and stitch the output files ('1') ('0' by default).",
+    )
+    parser.add_argument(
+        "-l",
+        "--monitor",
+        default="0",
+        help="Write the progress, throughput, failed time steps, and projected "
+        "completion time of the simulations in the terminal and in status.json, "
+        "reading the INFOSTEP file every given seconds ('0' by default, i.e., no "
+        "monitoring).",
+    )
+    parser.add_argument(
+        "-a",
+        "--autotune",
+        default="0",
+        help="Run the given injection time (spe11a [h]; spe11b/c [y]) with candidate "
+        "Flow flags in parallel after writing the deck, scoring them by simulated "
+        "time per wall second and failed time steps, and write the configuration "
+        "file with the best ones ('0' by default, i.e., no trials).",
+    )
     return vars(parser.parse_known_args()[0])
 
 
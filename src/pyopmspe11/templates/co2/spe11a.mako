@@ -1,3 +1,12 @@
+<%def name="include(name)">\
+% if dic["binary"]:
+IMPORT
+'${name}.IMPORT' /
+% else:
+INCLUDE
+'${name}.INC' /
+% endif
+</%def>\
 -- Copyright (C) 2023 NORCE
 -- This deck was generated by pyopmspe11 https://github.com/OPM/pyopmspe11
 ----------------------------------------------------------------------------
@@ -47,20 +56,20 @@ ${len(dic['wellijk'])} ${dic['noCells'][2]} ${len(dic['wellijk'])} ${len(dic['we
 % endif
 
 UNIFOUT
+% if dic["restart"]:
+UNIFIN
+% endif
 ----------------------------------------------------------------------------
 GRID
 ----------------------------------------------------------------------------
 INIT
 %if dic["grid"] == 'corner-point':
-INCLUDE
-'GRID.INC' /
+${include("GRID")}\
 %elif dic["grid"] == 'tensor':
-INCLUDE
-'DX.INC' /
+${include("DX")}\
 DY 
 ${dic['noCells'][0]*dic['noCells'][1]*dic['noCells'][2]}*${dic['ymy'][1]} /
-INCLUDE
-'DZ.INC' /
+${include("DZ")}\
 TOPS
 ${dic['noCells'][0]}*0.0 /
 %else:
@@ -74,8 +83,7 @@ TOPS
 ${dic['noCells'][0]}*0.0 /
 %endif
 
-INCLUDE
-'PERMX.INC' /
+${include("PERMX")}\
 
 COPY 
 PERMX PERMY /
@@ -88,8 +96,7 @@ PERMZ ${dic["kzMult"]} /
 /
 % endif
 
-INCLUDE
-'PORO.INC' /
+${include("PORO")}\
 
 % if dic["spe11aBC"] == 0:
 BCCON 
@@ -98,8 +105,7 @@ BCCON
 % endif
 
 % if sum(dic["dispersion"]) > 0:
-INCLUDE
-'DISPERC.INC' /
+${include("DISPERC")}\
 % endif
 
 % if dic["spe11aBC"] > 0:
@@ -155,10 +161,8 @@ NONE NONE NONE /
 ----------------------------------------------------------------------------
 REGIONS
 ----------------------------------------------------------------------------
-INCLUDE
-'SATNUM.INC' /
-INCLUDE
-'FIPNUM.INC' /
+${include("SATNUM")}\
+${include("FIPNUM")}\
 
 % if dic['model'] == 'convective':
 COPY
@@ -168,8 +172,13 @@ COPY
 ----------------------------------------------------------------------------
 SOLUTION
 ---------------------------------------------------------------------------
+% if dic["restart"]:
+RESTART
+'EQUIL' ${dic["restart"]} /
+% else:
 EQUIL
 ${dic['dims'][2]-dic['datum']} ${dic['pressure']/1.E5} ${0 if dic["co2store"] == "gaswater" else dic['dims'][2]} 0 0 0 1 1 0 /
+% endif
 
 RPTRST
 % if dic['model'] == 'immiscible': 
@@ -178,6 +187,7 @@ RPTRST
 'BASIC=2' DEN ${'PCGW' if dic["co2store"] == "gaswater" else ''}  ${'RSWSAT' if dic["version"] == "master" and dic["co2store"] == "gaswater" else ''} ${'RSSAT' if dic["version"] == "master" and dic["co2store"] == "gasoil" else ''}/
 % endif
 
+% if not dic["restart"]:
 % if dic['model'] == 'complete':
 % if dic["co2store"] == "gasoil":
 RSVD
@@ -193,6 +203,7 @@ RTEMPVD
 0   ${dic["temperature"][1]}
 ${dic['dims'][2]} ${dic["temperature"][0]} /
 % endif
+% endif
 ----------------------------------------------------------------------------
 SUMMARY
 ----------------------------------------------------------------------------
@@ -222,6 +233,10 @@ ${sensor[0]+1} ${sensor[1]+1} ${sensor[2]+1} /
 ----------------------------------------------------------------------------
 SCHEDULE
 ----------------------------------------------------------------------------
+% if dic["restart"]:
+SKIPREST
+
+% endif
 RPTRST
 % if dic['model'] == 'immiscible':
 'BASIC=2' FLOWS FLORES DEN/
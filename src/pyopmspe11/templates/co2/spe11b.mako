@@ -1,3 +1,12 @@
+<%def name="include(name)">\
+% if dic["binary"]:
+IMPORT
+'${name}.IMPORT' /
+% else:
+INCLUDE
+'${name}.INC' /
+% endif
+</%def>\
 -- Copyright (C) 2023 NORCE
 -- This deck was generated by pyopmspe11 https://github.com/OPM/pyopmspe11
 ----------------------------------------------------------------------------
@@ -54,25 +63,24 @@ ${len(dic['wellijk'])} ${dic['noCells'][2]} ${len(dic['wellijk'])} ${len(dic['we
 % endif
 
 UNIFOUT
+% if dic["restart"]:
+UNIFIN
+% endif
 ----------------------------------------------------------------------------
 GRID
 ----------------------------------------------------------------------------
 INIT
 %if dic["grid"] == 'corner-point':
-INCLUDE
-'GRID.INC' /
+${include("GRID")}\
 %elif dic["grid"] == 'tensor':
-INCLUDE
-'DX.INC' /
+${include("DX")}\
 DY 
 ${dic['noCells'][0]*dic['noCells'][1]*dic['noCells'][2]}*${dic['ymy'][1]} /
-INCLUDE
-'DZ.INC' /
+${include("DZ")}\
 TOPS
 ${dic['noCells'][0]}*0.0 /
 %else:
-INCLUDE
-'DX.INC' /
+${include("DX")}\
 DY 
 ${dic['noCells'][0]*dic['noCells'][1]*dic['noCells'][2]}*${dic['dsize'][1]} /
 DZ 
@@ -81,8 +89,7 @@ TOPS
 ${dic['noCells'][0]}*0.0 /
 %endif
 
-INCLUDE
-'PERMX.INC' /
+${include("PERMX")}\
 
 COPY 
 PERMX PERMY /
@@ -95,12 +102,10 @@ PERMZ ${dic["kzMult"]} /
 /
 % endif
 
-INCLUDE
-'PORO.INC' /
+${include("PORO")}\
 
 % if dic['model'] != 'immiscible':
-INCLUDE
-'THCONR.INC' /
+${include("THCONR")}\
 % endif
 
 % if dic['model'] != 'immiscible':
@@ -111,8 +116,7 @@ BCCON
 % endif
 
 % if sum(dic["dispersion"]) > 0:
-INCLUDE
-'DISPERC.INC' /
+${include("DISPERC")}\
 % endif
 ----------------------------------------------------------------------------
 EDIT
@@ -171,10 +175,8 @@ NONE NONE NONE /
 ----------------------------------------------------------------------------
 REGIONS
 ----------------------------------------------------------------------------
-INCLUDE
-'SATNUM.INC' /
-INCLUDE
-'FIPNUM.INC' /
+${include("SATNUM")}\
+${include("FIPNUM")}\
 
 % if dic['model'] == 'convective':
 COPY
@@ -184,8 +186,13 @@ COPY
 ----------------------------------------------------------------------------
 SOLUTION
 ---------------------------------------------------------------------------
+% if dic["restart"]:
+RESTART
+'EQUIL' ${dic["restart"]} /
+% else:
 EQUIL
 ${dic['dims'][2]-dic['datum']} ${dic['pressure']/1.E5} ${0 if dic["co2store"] == "gaswater" else dic['dims'][2]} 0 0 0 1 1 0 /
+% endif
 
 RPTRST
 % if dic['model'] == 'immiscible': 
@@ -194,6 +201,7 @@ RPTRST
 'BASIC=2' DEN ${'PCGW' if dic["co2store"] == "gaswater" else ''}  ${'RSWSAT' if dic["version"] == "master" and dic["co2store"] == "gaswater" else ''} ${'RSSAT' if dic["version"] == "master" and dic["co2store"] == "gasoil" else ''}/
 % endif
 
+% if not dic["restart"]:
 % if dic['model'] != 'immiscible':
 % if dic["co2store"] == "gasoil":
 RSVD
@@ -210,6 +218,7 @@ RTEMPVD
 0   ${dic["temperature"][1]}
 ${dic['dims'][2]} ${dic["temperature"][0]} /
 
+% endif
 ----------------------------------------------------------------------------
 SUMMARY
 ----------------------------------------------------------------------------
@@ -243,6 +252,10 @@ ${sensor[0]+1} ${sensor[1]+1} ${sensor[2]+1} /
 ----------------------------------------------------------------------------
 SCHEDULE
 ----------------------------------------------------------------------------
+% if dic["restart"]:
+SKIPREST
+
+% endif
 RPTRST
 % if dic['model'] == 'immiscible': 
 'BASIC=2' FLOWS FLORES DEN/
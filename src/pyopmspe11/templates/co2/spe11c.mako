@@ -1,3 +1,12 @@
+<%def name="include(name)">\
+% if dic["binary"]:
+IMPORT
+'${name}.IMPORT' /
+% else:
+INCLUDE
+'${name}.INC' /
+% endif
+</%def>\
 -- Copyright (C) 2023 NORCE
 -- This deck was generated by pyopmspe11 https://github.com/OPM/pyopmspe11
 ----------------------------------------------------------------------------
@@ -51,16 +60,17 @@ ${len(dic['wellijk'])} ${1+max(dic['wellijkf'][0][1]-dic['wellijk'][0][1], dic['
 % endif
 
 UNIFOUT
+% if dic["restart"]:
+UNIFIN
+% endif
 ----------------------------------------------------------------------------
 GRID
 ----------------------------------------------------------------------------
 INIT
 
-INCLUDE
-'GRID.INC' /
+${include("GRID")}\
 
-INCLUDE
-'PERMX.INC' /
+${include("PERMX")}\
 
 COPY 
 PERMX PERMY /
@@ -73,12 +83,10 @@ PERMZ ${dic["kzMult"]} /
 /
 % endif
 
-INCLUDE
-'PORO.INC' /
+${include("PORO")}\
 
 % if dic['model'] != 'immiscible':
-INCLUDE
-'THCONR.INC' /
+${include("THCONR")}\
 % endif
 
 % if dic['model'] != 'immiscible':
@@ -89,8 +97,7 @@ BCCON
 % endif
 
 % if sum(dic["dispersion"]) > 0:
-INCLUDE
-'DISPERC.INC' /
+${include("DISPERC")}\
 % endif
 ----------------------------------------------------------------------------
 EDIT
@@ -150,10 +157,8 @@ NONE NONE NONE /
 ----------------------------------------------------------------------------
 REGIONS
 ----------------------------------------------------------------------------
-INCLUDE
-'SATNUM.INC' /
-INCLUDE
-'FIPNUM.INC' /
+${include("SATNUM")}\
+${include("FIPNUM")}\
 
 % if dic['model'] == 'convective':
 COPY
@@ -164,8 +169,13 @@ COPY
 ----------------------------------------------------------------------------
 SOLUTION
 ---------------------------------------------------------------------------
+% if dic["restart"]:
+RESTART
+'EQUIL' ${dic["restart"]} /
+% else:
 EQUIL
 ${dic['maxelevation']+dic['dims'][2]-dic['datum']} ${dic['pressure']/1.E5} ${0 if dic["co2store"] == "gaswater" else dic['dims'][2]} 0 0 0 1 1 0 /
+% endif
 
 RPTRST
 % if dic['model'] == 'immiscible': 
@@ -174,6 +184,7 @@ RPTRST
 'BASIC=2' DEN ${'PCGW' if dic["co2store"] == "gaswater" else ''} ${'RSWSAT' if dic["version"] == "master" and dic["co2store"] == "gaswater" else ''} ${'RSSAT' if dic["version"] == "master" and dic["co2store"] == "gasoil" else ''}/
 % endif
 
+% if not dic["restart"]:
 % if dic['model'] != 'immiscible':
 % if dic["co2store"] == "gasoil":
 RSVD
@@ -189,6 +200,7 @@ RTEMPVD
 0   ${dic["temperature"][1]}
 ${dic['maxelevation']+dic['dims'][2]} ${dic["temperature"][0]} /
 % endif
+% endif
 ----------------------------------------------------------------------------
 SUMMARY
 ----------------------------------------------------------------------------
@@ -218,6 +230,10 @@ ${sensor[0]+1} ${sensor[1]+1} ${sensor[2]+1} /
 ----------------------------------------------------------------------------
 SCHEDULE
 ----------------------------------------------------------------------------
+% if dic["restart"]:
+SKIPREST
+
+% endif
 RPTRST
 % if dic['model'] == 'immiscible': 
 'BASIC=2' FLOWS FLORES DEN/
@@ -1,61 +0,0 @@
--- Copyright (C) 2023 NORCE
--- This deck was generated by pyopmspe11 https://github.com/OPM/pyopmspe11
-----------------------------------------------------------------------------
-RUNSPEC
-----------------------------------------------------------------------------
-DIMENS
-${dic["noCells"][0]} 1 ${dic["noCells"][2]} /
-
-GAS
-WATER
-CO2STORE
-
-EQLDIMS
-/
-
-TABDIMS
-/
-
-WELLDIMS
-/
-
-UNIFOUT
-----------------------------------------------------------------------------
-GRID
-----------------------------------------------------------------------------
-INIT
-
-INCLUDE
-'GRID.INC' /
-
-PORO
-${dic["noCells"][0]*dic["noCells"][2]}*0.2
-/
-
-PERMX
-${dic["noCells"][0]*dic["noCells"][2]}*20
-/
-
-COPY 
-PERMX PERMY /
-PERMX PERMZ /
-/
-----------------------------------------------------------------------------
-PROPS
-----------------------------------------------------------------------------
-SGWFN
-0. 0. 1. 0.
-1. 1. 0. 0. /
-----------------------------------------------------------------------------
-SOLUTION
-----------------------------------------------------------------------------
-EQUIL
-0 1 0 /
-
-RPTRST
-BASIC=2 /
-----------------------------------------------------------------------------
-SCHEDULE
-----------------------------------------------------------------------------
-TSTEP
-1E-4 /
\ No newline at end of file
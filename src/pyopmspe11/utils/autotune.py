@@ -0,0 +1,259 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""
+Utiliy functions to choose the Flow flags from short trial simulations.
+"""
+
+import os
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from mako.template import Template
+from pyopmspe11.utils.inputvalues import handle_tuning
+from pyopmspe11.utils.runs import equilibration, run_flow
+from pyopmspe11.utils.sweep import flow_cores
+from pyopmspe11.utils.writefile import write_decks
+
+CANDIDATES = [
+    "",  # The flags in the configuration file
+    "--linear-solver=cpr_trueimpes",
+    "--solver-growth-factor=3 --solver-restart-factor=0.5",
+    "--time-step-control=newtoniterationcount "
+    "--time-step-control-target-newton-iterations=3 "
+    "--time-step-control-growth-rate=1.15 --time-step-control-decay-rate=0.85",
+    "--nonlinear-solver=nldd --matrix-add-well-contributions=1 "
+    "--linear-solver=cpr_trueimpes --local-domains-ordering-measure=residual",
+    "--nonlinear-solver=nldd --matrix-add-well-contributions=1 "
+    "--linear-solver=cpr_trueimpes --local-domains-ordering-measure=residual "
+    "--time-step-control=newtoniterationcount "
+    "--time-step-control-target-newton-iterations=3 "
+    "--time-step-control-growth-rate=1.15 --time-step-control-decay-rate=0.85",
+]  # Flags replacing (or added to) the ones in the configuration file
+INFOSTEP = "--output-extra-convergence-info=steps,iterations"
+
+
+def autotune(dic, config):
+    """
+    Run the first dic["autotune"] hours (spe11a) or years (spe11b/c) of injection
+    with each candidate set of flags, several at a time within the cores budget,
+    and write the configuration file with the flags of the highest score (see
+    score) as <config>_tuned.txt, which are then used for the deck
+
+    Args:
+        dic (dict): Global dictionary\n
+        config (str): Name of the configuration file
+
+    Returns:
+        dic (dict): Modified global dictionary
+
+    """
+    path = f"{dic['exe']}/{dic['fol']}"
+    no_inj = 0
+    for inj in dic["inj"]:
+        if inj[4] + inj[7] > 0.0:
+            break
+        no_inj += 1
+    schedule = trial_schedule(dic, no_inj)
+    if os.path.isfile(f"{path}/deck/EQUIL.DATA"):
+        # The trials start from the restart file of the no-injection period
+        equilibration(dic)
+    trials = write_trials(dic, schedule, no_inj)
+    with ThreadPoolExecutor(max(1, dic["cores"] // flow_cores(config))) as executor:
+        list(
+            executor.map(
+                lambda trial: run_flow(
+                    {**dic, "flow": merge_flags(trial["flow"], INFOSTEP)},
+                    trial["deck"],
+                    trial["folder"],
+                ),
+                trials,
+            )
+        )
+    for trial in trials:
+        score(dic, trial)
+    trials.sort(key=lambda trial: -trial["score [d/s]"])
+    write_scores(dic, trials)
+    if not trials[0]["score [d/s]"]:
+        raise ValueError(f"No trial finished: see {path}/autotune")
+    name = os.path.splitext(os.path.basename(config))[0]
+    with open(config, "r", encoding="utf8") as file:
+        lines = file.read().split("\n")
+    lines[1] = trials[0]["flow"]
+    with open(f"{path}/{name}_tuned.txt", "w", encoding="utf8") as file:
+        file.write("\n".join(lines))
+    print(f"The flags of {trials[0]['deck']} are written in {path}/{name}_tuned.txt")
+    dic["flow"] = trials[0]["flow"]
+    handle_tuning(dic)
+    write_decks(dic, no_inj)
+
+
+def trial_schedule(dic, no_inj):
+    """
+    Injection periods of the trials, with the periods after the no-injection ones
+    cut after dic["autotune"] hours (spe11a) or years (spe11b/c)
+
+    Args:
+        dic (dict): Global dictionary\n
+        no_inj (int): Number of periods before the injection starts
+
+    Returns:
+        schedule (list): Injection periods of the trial decks
+
+    """
+    schedule = dic["inj"][:no_inj]
+    left = dic["autotune"] * dic["time"]
+    for inj in dic["inj"][no_inj:]:
+        if left <= 0:
+            break
+        dt_rep = min(inj[1], left)
+        schedule.append(
+            [max(1, round(min(inj[0], left) / dt_rep)) * dt_rep, dt_rep] + list(inj[2:])
+        )
+        left -= schedule[-1][0]
+    return schedule
+
+
+def write_trials(dic, schedule, no_inj):
+    """
+    Write the deck of each distinct set of flags (TUNE0.DATA, TUNE1.DATA, ...)
+
+    Args:
+        dic (dict): Global dictionary\n
+        schedule (list): Injection periods of the trial decks\n
+        no_inj (int): Number of periods before the injection starts
+
+    Returns:
+        trials (list): Deck, flags, output folder, and simulated period of the trials
+
+    """
+    path = f"{dic['exe']}/{dic['fol']}"
+    mytemplate = Template(filename=f"{dic['pat']}/templates/co2/{dic['spe11']}.mako")
+    trials = []
+    for flags in CANDIDATES:
+        flow = merge_flags(dic["flow"], flags)
+        if flow in [trial["flow"] for trial in trials]:
+            continue
+        trial = {"deck": f"TUNE{len(trials)}", "flow": flow}
+        trial["folder"] = f"autotune/{trial['deck']}"
+        trial["start [d]"] = (
+            sum(inj[0] for inj in dic["inj"][:no_inj]) / 86400.0
+            if dic["restart"]
+            else 0.0
+        )
+        trial["end [d]"] = sum(inj[0] for inj in schedule) / 86400.0
+        var = {"dic": {**dic, "flow": flow, "inj": schedule}}
+        handle_tuning(var["dic"])
+        with open(f"{path}/deck/{trial['deck']}.DATA", "w", encoding="utf8") as file:
+            file.write(f"-- Trial of the flags: {flow}\n")
+            file.write(mytemplate.render(**var))
+        os.makedirs(f"{path}/{trial['folder']}", exist_ok=True)
+        trials.append(trial)
+    return trials
+
+
+def merge_flags(flow, flags):
+    """
+    Replace the flags in the flow command by the given ones with the same name,
+    adding the other ones at the end
+
+    Args:
+        flow (str): Flow command with its flags\n
+        flags (str): Flags to replace or add
+
+    Returns:
+        flow (str): Modified flow command
+
+    """
+    values = flow.split()
+    for flag in flags.split():
+        names = [value.split("=")[0] for value in values]
+        if flag.split("=")[0] in names:
+            values[names.index(flag.split("=")[0])] = flag
+        else:
+            values.append(flag)
+    return " ".join(values)
+
+
+def score(dic, trial):
+    """
+    Score a trial by the simulated days per wall second of the Flow run, multiplied
+    by the fraction of successful time steps in the INFOSTEP file (zero if Flow
+    failed or did not reach the end of the trial)
+
+    Args:
+        dic (dict): Global dictionary\n
+        trial (dict): Deck, flags, output folder, and simulated period of the trial
+
+    Returns:
+        trial (dict): Modified trial with the score
+
+    """
+    folder = f"{dic['exe']}/{dic['fol']}/{trial['folder']}"
+    trial.update({"exit": None, "wall [s]": None, "time [d]": trial["start [d]"]})
+    trial.update({"steps": 0, "failed_steps": 0, "newton_iterations": 0})
+    trial.update({"linear_iterations": 0, "score [d/s]": 0.0})
+    if os.path.isfile(f"{folder}/usage.json"):
+        with open(f"{folder}/usage.json", "r", encoding="utf8") as file:
+            usage = json.load(file)
+        trial.update({"exit": usage["exit"], "wall [s]": usage["wall [s]"]})
+    if os.path.isfile(f"{folder}/{trial['deck']}.INFOSTEP"):
+        with open(f"{folder}/{trial['deck']}.INFOSTEP", "r", encoding="utf8") as file:
+            for row in file.read().splitlines():
+                values = row.split()
+                if len(values) < 12 or not values[0][0].isdigit():
+                    continue
+                trial["steps"] += 1
+                trial["failed_steps"] += int(float(values[11]) == 0)
+                trial["newton_iterations"] += int(float(values[9]))
+                trial["linear_iterations"] += int(float(values[10]))
+                if int(float(values[11])):
+                    # The Time(day) column is the time at the start of the step
+                    trial["time [d]"] = max(
+                        trial["time [d]"], float(values[0]) + float(values[1])
+                    )
+    if (
+        trial["exit"] == 0
+        and trial["wall [s]"]
+        and trial["steps"]
+        and trial["time [d]"] >= trial["end [d]"] * (1.0 - 1e-9)
+    ):
+        trial["score [d/s]"] = (
+            (trial["time [d]"] - trial["start [d]"])
+            / trial["wall [s]"]
+            * (1.0 - trial["failed_steps"] / trial["steps"])
+        )
+
+
+def write_scores(dic, trials):
+    """
+    Write the scores of the trials, from the highest one, in the terminal and in
+    autotune/scores.csv
+
+    Args:
+        dic (dict): Global dictionary\n
+        trials (list): Scored trials
+
+    Returns:
+        None
+
+    """
+    print(f"\n{'deck':<8}{'score [d/s]':>12}{'wall [s]':>10}{'failed':>10}  flags")
+    for trial in trials:
+        print(
+            f"{trial['deck']:<8}{trial['score [d/s]']:>12.4g}"
+            f"{trial['wall [s]'] or 0.0:>10.1f}"
+            f"{trial['failed_steps']:>5}/{trial['steps']:<4}  {trial['flow']}"
+        )
+    names = ["deck", "score [d/s]", "exit", "wall [s]", "time [d]", "steps"]
+    names += ["failed_steps", "newton_iterations", "linear_iterations", "flow"]
+    with open(
+        f"{dic['exe']}/{dic['fol']}/autotune/scores.csv",
+        "w",
+        encoding="utf8",
+        newline="",
+    ) as file:
+        writer = csv.writer(file)
+        writer.writerow(names)
+        for trial in trials:
+            writer.writerow([trial[name] for name in names])
@@ -0,0 +1,233 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""
+Utiliy functions for the pillars, corner depths, and cell geometry of the grids.
+"""
+
+import os
+import hashlib
+import shutil
+import numpy as np
+
+GRID_CACHE = 1  # Increase if the cached grid files change
+
+
+def grid_keywords(dic):
+    """
+    Compute the pillars (COORD) and corner depths (ZCORN) of the corner-point grids
+    and of the spe11c grids, with the same values as in the written GRID.INC
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        keywords (dict): Arrays with the COORD and ZCORN values
+
+    """
+    coord, nodes = grid_nodes(dic)
+    return {"COORD": coord, "ZCORN": corner_depths(nodes)}
+
+
+def grid_nodes(dic, slab=False):
+    """
+    Compute the pillars and the depths of the grid nodes, the latter as an array of
+    shape (nz + 1, ny + 1, nx + 1)
+
+    Args:
+        dic (dict): Global dictionary\n
+        slab (bool): Use the corner-point x-z slab (one cell in the y-dir) for spe11c
+
+    Returns:
+        coord (array): Floats with the COORD values per pillar\n
+        nodes (array): Floats with the depths of the grid nodes
+
+    """
+    n_x, n_z = dic["noCells"][0], dic["noCells"][2]
+    if slab or dic["spe11"] != "spe11c":
+        xcor = np.char.mod("%E", np.reshape(dic["xcor"], (n_x + 1, n_z + 1)))
+        zcor = np.char.mod("%E", np.reshape(dic["zcor"], (n_x + 1, n_z + 1)))
+        xcor, z_n = xcor.astype(float), zcor.astype(float).T
+        coord = np.zeros((2, n_x + 1, 6))
+        coord[:, :, 0], coord[:, :, 2] = xcor[:, 0], z_n[0]
+        coord[:, :, 3], coord[:, :, 5] = xcor[:, -1], z_n[-1]
+        coord[1, :, 1] = coord[1, :, 4] = dic["dims"][1]
+        return coord, np.broadcast_to(z_n[:, None, :], (n_z + 1, 2, n_x + 1))
+    y_n = np.array(dic["ymy"], dtype=float)
+    coord = np.zeros((len(y_n), n_x + 1, 6))
+    coord[:, :, 0] = coord[:, :, 3] = dic["xmx"]
+    coord[:, :, 1] = coord[:, :, 4] = y_n[:, None]
+    if dic["grid"] == "corner-point":
+        z_n = np.reshape(np.array(dic["zcor"], dtype=float), (n_x + 1, n_z + 1)).T
+    else:
+        z_n = np.repeat(np.array(dic["zmz"], dtype=float)[:, None], n_x + 1, 1)
+    z_n[0], z_n[-1] = 0.0, dic["dims"][2]
+    y_n = y_n[None, :, None]
+    nodes = (
+        (dic["maxelevation"] + z_n[:, None, :])
+        - dic["elevation"] * (1.0 - (y_n / (0.5 * dic["dims"][1]) - 1) ** 2.0)
+    ) - y_n * dic["backElevation"] / dic["dims"][1]
+    return coord, nodes
+
+
+def corner_depths(nodes):
+    """
+    Expand the depths of the grid nodes to the eight corners of each cell following
+    the ZCORN ordering, i.e., an array of shape (nz, 2, ny, 2, nx, 2)
+
+    Args:
+        nodes (array): Depths (or their strings) of the grid nodes
+
+    Returns:
+        zcorn (array): Depths (or their strings) of the cell corners
+
+    """
+    zcorn = np.stack((nodes[:-1], nodes[1:]), axis=1)
+    zcorn = np.stack((zcorn[:, :, :-1], zcorn[:, :, 1:]), axis=3)
+    return np.stack((zcorn[..., :-1], zcorn[..., 1:]), axis=-1)
+
+
+def grid_cache(dic):
+    """
+    Set the cache folder for the files of the corner-point grid, named after a hash
+    of the inputs defining the grid, so runs on the same grid reuse them
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        dic (dict): Modified global dictionary
+
+    """
+    sha = hashlib.sha256(
+        f"{GRID_CACHE} {dic['spe11']} {dic['dims']} {np.ravel(dic['x_n']).tolist()} "
+        f"{np.ravel(dic['y_n']).tolist()} {np.ravel(dic['z_n']).tolist()} "
+        f"{dic['elevation']} {dic['backElevation']} {dic['widthBuffer']}".encode()
+    )
+    with open(f"{dic['pat']}/reference_mesh/lines_coordinates.geo", "rb") as file:
+        sha.update(file.read())
+    dic["grid_cache"] = f"{dic['cache']}/grid_v{GRID_CACHE}_{sha.hexdigest()[:16]}"
+
+
+def from_cache(dic, names, cache=None):
+    """
+    Copy the given files from the cache folder to the deck folder
+
+    Args:
+        dic (dict): Global dictionary\n
+        names (list): Names of the files\n
+        cache (str): Cache folder (the one of the grid files by default)
+
+    Returns:
+        cached (bool): True if all the files were in the cache folder
+
+    """
+    cache = cache or dic["grid_cache"]
+    if not all(os.path.isfile(f"{cache}/{name}") for name in names):
+        return False
+    for name in names:
+        shutil.copyfile(f"{cache}/{name}", f"{dic['exe']}/{dic['fol']}/deck/{name}")
+    return True
+
+
+def to_cache(dic, names, cache=None, folder="deck"):
+    """
+    Copy the given files from the output folder to the cache folder, replacing
+    each file at once so concurrent runs never read a partially written one
+
+    Args:
+        dic (dict): Global dictionary\n
+        names (list): Names of the files\n
+        cache (str): Cache folder (the one of the grid files by default)\n
+        folder (str): Folder in the output folder with the files
+
+    Returns:
+        None
+
+    """
+    cache = cache or dic["grid_cache"]
+    try:
+        os.makedirs(cache, exist_ok=True)
+        for name in names:
+            tmp = f"{cache}/{name}.{os.getpid()}"
+            shutil.copyfile(f"{dic['exe']}/{dic['fol']}/{folder}/{name}", tmp)
+            os.replace(tmp, f"{cache}/{name}")
+    except OSError:
+        print(f"The cache could not be written in {cache}")
+
+
+def cell_geometry(dic):
+    """
+    Compute the corners, centers, and thickness of the cells in the x-z slab of the
+    corner-point grids from the same COORD/ZCORN values written in GRID.INC (or
+    load them from the grid cache)
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        dic (dict): Modified global dictionary
+
+    """
+    dic["nxyzf"] = [dic["noCells"][0], 1, dic["noCells"][2]]
+    dic["no_cells"] = dic["nxyzf"][0] * dic["nxyzf"][2]
+    dic["cell_ijk"] = np.column_stack(
+        np.unravel_index(np.arange(dic["no_cells"]), dic["nxyzf"], order="F")
+    )
+    names = ["cell_xcor", "cell_zcor", "cell_xyz", "d_z"]
+    cache = f"{dic['grid_cache']}/geometry.npz"
+    if os.path.isfile(cache):
+        with np.load(cache) as geometry:
+            for name in names:
+                dic[name] = geometry[name]
+        return
+    coord, nodes = grid_nodes(dic, slab=True)
+    dic["cell_xcor"], dic["cell_zcor"] = cell_corners(
+        coord, corner_depths(nodes), dic["cell_ijk"]
+    )
+    dic["cell_xyz"] = np.column_stack(
+        (
+            dic["cell_xcor"].mean(axis=1),
+            np.full(dic["no_cells"], 0.5 * dic["dims"][1]),
+            dic["cell_zcor"].mean(axis=1),
+        )
+    )
+    # Thickness averaged over the four pillars (as DZ in the Flow INIT file)
+    dic["d_z"] = 0.25 * (
+        dic["cell_zcor"][:, 4:].sum(axis=1) - dic["cell_zcor"][:, :4].sum(axis=1)
+    )
+    try:
+        os.makedirs(dic["grid_cache"], exist_ok=True)
+        with open(f"{cache}.{os.getpid()}", "wb") as file:
+            np.savez(file, **{name: dic[name] for name in names})
+        os.replace(f"{cache}.{os.getpid()}", cache)
+    except OSError:
+        print(f"The grid cache could not be written in {dic['grid_cache']}")
+
+
+def cell_corners(coord, zcorn, ijk):
+    """
+    Compute the x and z coordinates of the eight corners of the given cells from
+    the pillars (COORD) and corner depths (ZCORN)
+
+    Args:
+        coord (array): Floats with the COORD values, shape (ny + 1, nx + 1, 6)\n
+        zcorn (array): Floats with the ZCORN values, shape (nz, 2, ny, 2, nx, 2)\n
+        ijk (array): Integers with the i, j, and k indices of the cells
+
+    Returns:
+        xcor (array): Floats with the x-positions of the cell corners\n
+        zcor (array): Floats with the z-positions of the cell corners
+
+    """
+    i, j, k = ijk.T
+    xcor = np.zeros((len(ijk), 8))
+    zcor = np.zeros((len(ijk), 8))
+    for n in range(8):
+        zcor[:, n] = zcorn[k, n // 4, j, (n // 2) % 2, i, n % 2]
+        x_t, _, z_t, x_b, _, z_b = coord[j + (n // 2) % 2, i + n % 2].T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xcor[:, n] = np.where(
+                z_t == z_b, x_t, x_t + (x_b - x_t) / (z_t - z_b) * (z_t - zcor[:, n])
+            )
+    return xcor, zcor
@@ -6,21 +6,25 @@
 Utiliy function for the grid and locations in the geological models.
 """
 
-import csv
+import os
+import hashlib
+from zipfile import BadZipFile
 import numpy as np
 import pandas as pd
-from shapely.geometry import Polygon
-
-try:
-    from opm.io.ecl import EGrid as OpmGrid
-    from opm.io.ecl import EclFile as OpmFile
-except ImportError:
-    print("The opm Python package was not found, using resdata")
-try:
-    from resdata.resfile import ResdataFile
-    from resdata.grid import Grid
-except ImportError:
-    print("The resdata Python package was not found, using opm")
+from shapely import (
+    area,
+    bounds,
+    distance,
+    intersects_xy,
+    linearrings,
+    points,
+    polygons,
+    prepare,
+)
+from pyopmspe11.utils.geometry import cell_geometry, grid_cache
+from pyopmspe11.utils.timings import timer
+
+MESH_CACHE = 2  # Increase if the cached facies polygons change
 
 
 def grid(dic):
@@ -83,59 +87,16 @@ def structured_handling_spe11a(dic):
         dic (dict): Modified global dictionary
 
     """
-    sensor1, sensor2, centers, corners = [], [], [], []
-    for k in range(dic["noCells"][2]):
-        for i in range(dic["noCells"][0]):
-            fgl = pd.Series(
-                (
-                    (dic["cxc1"] - dic["xmx_center"][i]) ** 2
-                    + (dic["czc1"] - dic["zmz_center"][k]) ** 2
-                )
-            ).argmin()
-            sensor1.append(
-                (dic["xmx_center"][i] - dic["sensors"][0][0]) ** 2
-                + (dic["zmz_center"][k] + dic["sensors"][0][2] - dic["dims"][2]) ** 2
-            )
-            sensor2.append(
-                (dic["xmx_center"][i] - dic["sensors"][1][0]) ** 2
-                + (dic["zmz_center"][k] + dic["sensors"][1][2] - dic["dims"][2]) ** 2
-            )
-            dic["satnum"].append(dic["ids_gmsh"][fgl][0])
-            boxes(dic, dic["xmx_center"][i], dic["zmz_center"][k], i, dic["satnum"][-1])
-            dic["permx"].append(dic["rock"][int(dic["ids_gmsh"][fgl][0]) - 1][0])
-            dic["poro"].append(dic["rock"][int(dic["ids_gmsh"][fgl][0]) - 1][1])
-            dic["disperc"].append(
-                f"{dic['dispersion'][int(dic['ids_gmsh'][fgl][0])-1]}"
-            )
-            centers.append(
-                str([dic["xmx_center"][i], dic["ymy_center"][0], dic["zmz_center"][k]])[
-                    1:-1
-                ]
-            )
-            corners.append(
-                f"{dic['xmx'][i]}, {dic['dims'][2] -dic['zmz'][k]}, {dic['xmx'][i+1]}, "
-                + f"{dic['dims'][2] -dic['zmz'][k]}, {dic['xmx'][i+1]}, "
-                + f"{dic['dims'][2] -dic['zmz'][k+1]}, {dic['xmx'][i]}, "
-                + f"{dic['dims'][2] -dic['zmz'][k+1]}"
-            )
-    dic["pop1"] = pd.Series(sensor1).argmin()
-    dic["pop2"] = pd.Series(sensor2).argmin()
-    dic["fipnum"][dic["pop1"]] = "8"
-    dic["fipnum"][dic["pop2"]] = "9"
+    x_c, z_c = np.meshgrid(dic["xmx_center"], dic["zmz_center"])
+    facies = dic["ids_facies"][find_facies(dic, x_c.flatten(), z_c.flatten())]
+    set_properties(dic, facies)
+    fipnums(dic, x_c, z_c, facies)
+    closest_sensors(dic, x_c, z_c)
+    dic["fipnum"][dic["pop1"]] = 8
+    dic["fipnum"][dic["pop2"]] = 9
     sensors(dic)
     wells(dic)
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/centers.txt",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write("\n".join(centers))
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/corners.txt",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write("\n".join(corners))
+    write_centers_corners(dic, *structured_centers_corners(dic, x_c, z_c))
 
 
 def structured_handling_spe11bc(dic):
@@ -149,168 +110,122 @@ def structured_handling_spe11bc(dic):
         dic (dict): Modified global dictionary
 
     """
-    sensor1, sensor2, centers, corners, pv_l = [], [], [], [], 0
-    for k in range(dic["noCells"][2]):
-        for i in range(dic["noCells"][0]):
-            fgl = pd.Series(
-                (
-                    (dic["cxc1"] - dic["xmx_center"][i]) ** 2
-                    + (dic["czc1"] - dic["zmz_center"][k]) ** 2
-                )
-            ).argmin()
-            sensor1.append(
-                (dic["xmx_center"][i] - dic["sensors"][0][0]) ** 2
-                + (dic["ymy_center"][0] - dic["sensors"][0][1]) ** 2
-                + (dic["zmz_center"][k] + dic["sensors"][0][2] - dic["dims"][2]) ** 2
-            )
-            sensor2.append(
-                (dic["xmx_center"][i] - dic["sensors"][1][0]) ** 2
-                + (dic["ymy_center"][0] - dic["sensors"][1][1]) ** 2
-                + (dic["zmz_center"][k] + dic["sensors"][1][2] - dic["dims"][2]) ** 2
-            )
-            z_c = dic["zmz_center"][k]
-            if dic["spe11"] == "spe11c":
-                z_c -= map_z(dic, 0)
-            dic["satnum"].append(dic["ids_gmsh"][fgl][0])
-            boxes(dic, dic["xmx_center"][i], z_c, i, dic["satnum"][-1])
-            dic["permx"].append(dic["rock"][int(dic["ids_gmsh"][fgl][0]) - 1][0])
-            poro = dic["rock"][int(dic["ids_gmsh"][fgl][0]) - 1][1]
-            dic["poro"].append(poro)
-            pv = float(poro) * (dic["pvAdded"] + dic["widthBuffer"])
-            dic["thconr"].append(
-                f"{dic['rockCond'][int(dic['ids_gmsh'][fgl][0])-1][0]}"
-            )
-            dic["disperc"].append(
-                f"{dic['dispersion'][int(dic['ids_gmsh'][fgl][0])-1]}"
-            )
-            if i == 0 and (
-                int(dic["ids_gmsh"][fgl][0]) != 1 and int(dic["ids_gmsh"][fgl][0]) != 7
-            ):
-                dic["porv"].append(
-                    f"PORV {pv*dic['dy'][0]*dic['dz'][k]} 1 1 1 1 {k+1} {k+1} /"
-                )
-                pv_l = pv
-            elif i == dic["noCells"][0] - 1 and (
-                int(dic["ids_gmsh"][fgl][0]) != 1 and int(dic["ids_gmsh"][fgl][0]) != 7
-            ):
-                dic["porv"].append(
-                    f"PORV {pv*dic['dy'][0]*dic['dz'][k]} {dic['noCells'][0]} "
-                    + f"{dic['noCells'][0]} 1 1 {k+1} {k+1} /"
-                )
-            centers.append(
-                str([dic["xmx_center"][i], dic["ymy_center"][0], dic["zmz_center"][k]])[
-                    1:-1
-                ]
-            )
-            corners.append(
-                f"{dic['xmx'][i]}, {dic['dims'][2] -dic['zmz'][k]}, {dic['xmx'][i+1]}, "
-                + f"{dic['dims'][2] -dic['zmz'][k]}, {dic['xmx'][i+1]}, "
-                + f"{dic['dims'][2] -dic['zmz'][k+1]}, {dic['xmx'][i]}, "
-                + f"{dic['dims'][2] -dic['zmz'][k+1]}"
-            )
-        for j in range(dic["noCells"][1] - 1):
-            for names in ["satnum", "poro", "permx", "disperc", "thconr"]:
-                dic[f"{names}"].extend(dic[f"{names}"][-dic["noCells"][0] :])
-            for i_i in range(dic["noCells"][0]):
-                sensor1.append(
-                    (dic["xmx_center"][i_i] - dic["sensors"][0][0]) ** 2
-                    + (dic["ymy_center"][j + 1] - dic["sensors"][0][1]) ** 2
-                    + (dic["zmz_center"][k] + dic["sensors"][0][2] - dic["dims"][2])
-                    ** 2
-                )
-                sensor2.append(
-                    (dic["xmx_center"][i_i] - dic["sensors"][1][0]) ** 2
-                    + (dic["ymy_center"][j + 1] - dic["sensors"][1][1]) ** 2
-                    + (dic["zmz_center"][k] + dic["sensors"][1][2] - dic["dims"][2])
-                    ** 2
-                )
-                z_c = dic["zmz_center"][k]
-                if dic["spe11"] == "spe11c":
-                    z_c -= map_z(dic, j + 1)
-                boxes(
-                    dic,
-                    dic["xmx_center"][i_i],
-                    z_c,
-                    i_i,
-                    dic["satnum"][-dic["noCells"][0] + i_i],
-                )
-                if i_i == 0 and (
-                    int(dic["satnum"][-dic["noCells"][0] + i_i]) != 1
-                    and int(dic["satnum"][-dic["noCells"][0] + i_i]) != 7
-                ):
-                    dic["porv"].append(
-                        f"PORV {pv_l*dic['dy'][j+1]*dic['dz'][k]} 1 1 "
-                        + f"{j+2} {j+2} {k+1} {k+1} /"
-                    )
-                elif i_i == dic["noCells"][0] - 1 and (
-                    int(dic["satnum"][-dic["noCells"][0] + i_i]) != 1
-                    and int(dic["satnum"][-dic["noCells"][0] + i_i]) != 7
-                ):
-                    dic["porv"].append(
-                        f"PORV {pv*dic['dy'][j+1]*dic['dz'][k]} {dic['noCells'][0]} "
-                        + f"{dic['noCells'][0]} {j+2} {j+2} {k+1} {k+1} /"
-                    )
-    if dic["spe11"] == "spe11c":
-        add_pv_fipnum_front_back(dic)
-    dic["pop1"] = pd.Series(sensor1).argmin()
-    dic["pop2"] = pd.Series(sensor2).argmin()
-    dic["fipnum"][dic["pop1"]] = "8"
-    dic["fipnum"][dic["pop2"]] = "9"
+    x_c, z_c = np.meshgrid(dic["xmx_center"], dic["zmz_center"])
+    facies = dic["ids_facies"][find_facies(dic, x_c.flatten(), z_c.flatten())]
+    set_properties(dic, facies)
+    fipnums(dic, x_c, z_c, facies)
+    add_pv_boundaries(
+        dic,
+        facies,
+        dic["dx"],
+        dic["dy"],
+        np.broadcast_to(dic["dz"][:, None], x_c.shape),
+    )
+    closest_sensors(dic, x_c, z_c)
+    dic["fipnum"][dic["pop1"]] = 8
+    dic["fipnum"][dic["pop2"]] = 9
     sensors(dic)
     wells(dic)
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/centers.txt",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write("\n".join(centers))
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/corners.txt",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write("\n".join(corners))
+    write_centers_corners(dic, *structured_centers_corners(dic, x_c, z_c))
 
 
-def add_pv_fipnum_front_back(dic):
+def closest_sensors(dic, x_c, z_c):
     """
-    Add the buffer pore volume and bc labels also on the front and back boundaries.
+    Find the cells in the tensor/cartesian grid with the closest centers to the
+    sensors (pop1 and pop2)
 
     Args:
-        dic (dict): Global dictionary
+        dic (dict): Global dictionary\n
+        x_c (array): Floats with the x-positions of the cell centers in the slab\n
+        z_c (array): Floats with the z-positions of the cell centers in the slab
 
     Returns:
         dic (dict): Modified global dictionary
 
     """
-    for k in range(dic["noCells"][2]):
-        for i in range(dic["noCells"][0] - 2):
-            ind = i + 1 + k * dic["noCells"][0] * dic["noCells"][1]
-            if int(dic["satnum"][ind]) != 1 and int(dic["satnum"][ind]) != 7:
-                pv = float(dic["poro"][ind]) * (dic["pvAdded"] + dic["widthBuffer"])
-                if dic["grid"] == "corner-point":
-                    ind_xz = i + 1 + k * dic["noCells"][0]
-                    dic["porv"].append(
-                        f"PORV {pv*dic['d_x'][i+1]*dic['d_z'][ind_xz]} {i+2} {i+2} "
-                        + f"1 1 {k+1} {k+1} /"
-                    )
-                    dic["porv"].append(
-                        f"PORV {pv*dic['d_x'][i+1]*dic['d_z'][ind_xz]} {i+2} {i+2} "
-                        + f"{dic['noCells'][1]} {dic['noCells'][1]} {k+1} {k+1} /"
-                    )
-                else:
-                    dic["porv"].append(
-                        f"PORV {pv*dic['dx'][i+1]*dic['dz'][k]} {i+2} {i+2} "
-                        + f"1 1 {k+1} {k+1} /"
-                    )
-                    dic["porv"].append(
-                        f"PORV {pv*dic['dx'][i+1]*dic['dz'][k]} {i+2} {i+2} "
-                        + f"{dic['noCells'][1]} {dic['noCells'][1]} {k+1} {k+1} /"
-                    )
-            set_back_front_fipnums(dic, ind)
+    x_c, z_c = extrude(dic, x_c), extrude(dic, z_c)
+    for name, sensor in zip(["pop1", "pop2"], dic["sensors"]):
+        distance2 = (x_c - sensor[0]) ** 2
+        if dic["spe11"] != "spe11a":
+            distance2 = (
+                distance2 + (np.reshape(dic["ymy_center"], (1, -1, 1)) - sensor[1]) ** 2
+            )
+        dic[name] = int(np.argmin(distance2 + (z_c + sensor[2] - dic["dims"][2]) ** 2))
+
+
+def add_pv_boundaries(dic, facies, d_x, d_y, d_z):
+    """
+    Add the buffer pore volume on the left and right boundaries, and for the spe11c
+    also on the front and back boundaries together with their bc labels
+
+    Args:
+        dic (dict): Global dictionary\n
+        facies (array): Integers with the facie in the cells in the slab\n
+        d_x (array): Floats with the cell sizes in the x-dir\n
+        d_y (array): Floats with the cell sizes in the y-dir\n
+        d_z (array): Floats with the cell thickness in the slab, shape (nz, nx)
+
+    Returns:
+        dic (dict): Modified global dictionary
+
+    """
+    n_x, n_y, n_z = dic["noCells"]
+    facies = np.reshape(facies, (n_z, n_x))
+    pv = np.array(dic["rock"], dtype=float)[facies - 1, 1] * (
+        dic["pvAdded"] + dic["widthBuffer"]
+    )
+    buffer = (facies != 1) & (facies != 7)
+    ind = np.array([0, n_x - 1] if n_x > 1 else [0])
+    # Records ordered by k, j, and left/right
+    porv_records(
+        dic,
+        pv[:, None, ind] * np.reshape(d_y, (1, -1, 1)) * d_z[:, None, ind],
+        np.broadcast_to(buffer[:, None, ind], (n_z, n_y, len(ind))),
+        np.reshape(ind + 1, (1, 1, -1)),
+        np.reshape(np.arange(1, n_y + 1), (1, -1, 1)),
+    )
+    if dic["spe11"] == "spe11c":
+        # Records ordered by k, i, and front/back
+        porv_records(
+            dic,
+            np.broadcast_to(
+                (pv[:, 1:-1] * d_x[1:-1] * d_z[:, 1:-1])[:, :, None],
+                (n_z, n_x - 2, 2),
+            ),
+            np.broadcast_to(buffer[:, 1:-1, None], (n_z, n_x - 2, 2)),
+            np.reshape(np.arange(2, n_x), (1, -1, 1)),
+            np.reshape([1, n_y], (1, 1, -1)),
+        )
+        set_back_front_fipnums(dic, facies)
+
+
+def porv_records(dic, values, mask, i_x, j_y):
+    """
+    Add the PORV records for the masked cells (shape (nz, :, :)), keeping the order
+    of the values
+
+    Args:
+        dic (dict): Global dictionary\n
+        values (array): Floats with the pore volumes\n
+        mask (array): Booleans with the cells to add\n
+        i_x (array): Integers with the i indices (starting at 1) of the values\n
+        j_y (array): Integers with the j indices (starting at 1) of the values
+
+    Returns:
+        dic (dict): Modified global dictionary
+
+    """
+    k_z = np.reshape(np.arange(1, values.shape[0] + 1), (-1, 1, 1))
+    i_x, j_y, k_z = (
+        np.broadcast_to(ind, values.shape)[mask].tolist() for ind in [i_x, j_y, k_z]
+    )
+    dic["porv"] += [
+        f"PORV {val} {i} {i} {j} {j} {k} {k} /"
+        for val, i, j, k in zip(values[mask].tolist(), i_x, j_y, k_z)
+    ]
 
 
-def set_back_front_fipnums(dic, ind):
+def set_back_front_fipnums(dic, satnum):
     """
     For the front and back boundaries in spe11c:\n
     Box A: Fipnum 13\n
@@ -321,37 +236,22 @@ def set_back_front_fipnums(dic, ind):
     Satnum 1 and Box C: Fipnum 18\n
 
     Args:
-        dic (dict): Global dictionary
-        ind (int): ID index for the property
+        dic (dict): Global dictionary\n
+        satnum (array): Integers with the facie in the cells in the slab
 
     Returns:
         dic (dict): Modified global dictionary
 
     """
-    if int(dic["fipnum"][ind]) == 2:
-        dic["fipnum"][ind] = "13"
-        dic["fipnum"][ind + dic["noCells"][0] * (dic["noCells"][1] - 1)] = "13"
-    elif int(dic["fipnum"][ind]) == 5:
-        dic["fipnum"][ind] = "14"
-        dic["fipnum"][ind + dic["noCells"][0] * (dic["noCells"][1] - 1)] = "14"
-    elif int(dic["fipnum"][ind]) == 3:
-        dic["fipnum"][ind] = "15"
-        dic["fipnum"][ind + dic["noCells"][0] * (dic["noCells"][1] - 1)] = "15"
-    elif int(dic["fipnum"][ind]) == 6:
-        dic["fipnum"][ind] = "16"
-        dic["fipnum"][ind + dic["noCells"][0] * (dic["noCells"][1] - 1)] = "16"
-    elif int(dic["fipnum"][ind]) == 4:
-        dic["fipnum"][ind] = "17"
-        dic["fipnum"][ind + dic["noCells"][0] * (dic["noCells"][1] - 1)] = "17"
-    elif int(dic["fipnum"][ind]) == 12:
-        dic["fipnum"][ind] = "18"
-        dic["fipnum"][ind + dic["noCells"][0] * (dic["noCells"][1] - 1)] = "18"
-    elif int(dic["satnum"][ind]) == 1:
-        dic["fipnum"][ind] = "10"
-        dic["fipnum"][ind + dic["noCells"][0] * (dic["noCells"][1] - 1)] = "10"
-    else:
-        dic["fipnum"][ind] = "11"
-        dic["fipnum"][ind + dic["noCells"][0] * (dic["noCells"][1] - 1)] = "11"
+    fipnum = np.reshape(dic["fipnum"], (dic["noCells"][2], dic["noCells"][1], -1))
+    front = fipnum[:, 0, 1:-1]
+    front = np.select(
+        [front == num for num in [2, 5, 3, 6, 4, 12]],
+        [13, 14, 15, 16, 17, 18],
+        np.where(satnum[:, 1:-1] == 1, 10, 11),
+    )
+    fipnum[:, 0, 1:-1] = front
+    fipnum[:, -1, 1:-1] = front
 
 
 def corner_point_handling_spe11a(dic):
@@ -365,108 +265,111 @@ def corner_point_handling_spe11a(dic):
         dic (dict): Modified global dictionary
 
     """
-    well1, well2, sensor1, sensor2, centers, corners = [], [], [], [], [], []
     dic["wellijk"] = [[] for _ in range(len(dic["wellCoord"]))]
-    for i in range(dic["no_cells"]):
-        get_cell_info(dic, i)
-        fgl = pd.Series(
-            ((dic["cxc1"] - dic["xyz"][0]) ** 2 + (dic["czc1"] - dic["xyz"][2]) ** 2)
-        ).argmin()
-        well1.append(
-            (dic["wellCoord"][0][0] - dic["xyz"][0]) ** 2
-            + (dic["wellCoord"][0][2] - dic["xyz"][2]) ** 2
-        )
-        well2.append(
-            (dic["wellCoord"][1][0] - dic["xyz"][0]) ** 2
-            + (dic["wellCoord"][1][2] - dic["xyz"][2]) ** 2
-        )
-        sensor1.append(
-            (dic["xyz"][0] - dic["sensors"][0][0]) ** 2
-            + (dic["xyz"][2] + dic["sensors"][0][2] - dic["dims"][2]) ** 2
-        )
-        sensor2.append(
-            (dic["xyz"][0] - dic["sensors"][1][0]) ** 2
-            + (dic["xyz"][2] + dic["sensors"][1][2] - dic["dims"][2]) ** 2
-        )
-        dic["satnum"].append(dic["ids_gmsh"][fgl][0])
-        boxes(dic, dic["xyz"][0], dic["xyz"][2], dic["ijk"][0], dic["satnum"][-1])
-        dic["permx"].append(dic["rock"][int(dic["ids_gmsh"][fgl][0]) - 1][0])
-        dic["poro"].append(dic["rock"][int(dic["ids_gmsh"][fgl][0]) - 1][1])
-        dic["disperc"].append(f"{dic['dispersion'][int(dic['ids_gmsh'][fgl][0])-1]}")
-        centers.append(str([dic["xyz"][0], dic["ymy_center"][0], dic["xyz"][2]])[1:-1])
-        corners.append(dic["corns"])
-    dic["pop1"] = pd.Series(sensor1).argmin()
-    dic["pop2"] = pd.Series(sensor2).argmin()
-    dic["fipnum"][dic["pop1"]] = "8"
-    dic["fipnum"][dic["pop2"]] = "9"
-    idwell1 = pd.Series(well1).argmin()
-    idwell2 = pd.Series(well2).argmin()
-    if dic["use"] == "opm":
-        well1ijk = dic["gridf"].ijk_from_global_index(idwell1)
-        well2ijk = dic["gridf"].ijk_from_global_index(idwell2)
-        dic["sensorijk"][0] = dic["gridf"].ijk_from_global_index(dic["pop1"])
-        dic["sensorijk"][1] = dic["gridf"].ijk_from_global_index(dic["pop2"])
-    else:
-        well1ijk = dic["gridf"].get_ijk(global_index=idwell1)
-        well2ijk = dic["gridf"].get_ijk(global_index=idwell2)
-        dic["sensorijk"][0] = dic["gridf"].get_ijk(global_index=dic["pop1"])
-        dic["sensorijk"][1] = dic["gridf"].get_ijk(global_index=dic["pop2"])
+    x_c, z_c = dic["cell_xyz"][:, 0], dic["cell_xyz"][:, 2]
+    facies = dic["ids_facies"][find_facies(dic, x_c, z_c)]
+    set_properties(dic, facies)
+    fipnums(dic, x_c, z_c, facies)
+    dic["pop1"] = pd.Series(
+        (x_c - dic["sensors"][0][0]) ** 2
+        + (z_c + dic["sensors"][0][2] - dic["dims"][2]) ** 2
+    ).argmin()
+    dic["pop2"] = pd.Series(
+        (x_c - dic["sensors"][1][0]) ** 2
+        + (z_c + dic["sensors"][1][2] - dic["dims"][2]) ** 2
+    ).argmin()
+    dic["fipnum"][dic["pop1"]] = 8
+    dic["fipnum"][dic["pop2"]] = 9
+    idwell1 = pd.Series(
+        (dic["wellCoord"][0][0] - x_c) ** 2 + (dic["wellCoord"][0][2] - z_c) ** 2
+    ).argmin()
+    idwell2 = pd.Series(
+        (dic["wellCoord"][1][0] - x_c) ** 2 + (dic["wellCoord"][1][2] - z_c) ** 2
+    ).argmin()
+    well1ijk = dic["cell_ijk"][idwell1].tolist()
+    well2ijk = dic["cell_ijk"][idwell2].tolist()
+    dic["sensorijk"][0] = dic["cell_ijk"][dic["pop1"]].tolist()
+    dic["sensorijk"][1] = dic["cell_ijk"][dic["pop2"]].tolist()
     dic["wellijk"][0] = [well1ijk[0] + 1, 1, well1ijk[2] + 1]
     dic["wellijk"][1] = [well2ijk[0] + 1, 1, well2ijk[2] + 1]
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/centers.txt",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write("\n".join(centers))
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/corners.txt",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write("\n".join(corners))
+    write_centers_corners(dic, *corner_point_centers_corners(dic))
 
 
-def get_cell_info(dic, i):
+def structured_centers_corners(dic, x_c, z_c):
     """
-    Get the cell center coordinate and ijk from the simulation cell
+    Get the centers and corners (in the x-z plane) of the tensor/cartesian cells
 
     Args:
         dic (dict): Global dictionary\n
-        i (int): Global cell index
+        x_c (array): Floats with the x-positions of the cell centers\n
+        z_c (array): Floats with the z-positions of the cell centers
 
     Returns:
-        dic (dict): Modified global dictionary
+        centers (array): Floats with the x, y, and z positions of the cell centers\n
+        corners (array): Floats with the x and z positions of the cell corners
 
     """
-    if dic["use"] == "opm":
-        dic["ijk"] = dic["gridf"].ijk_from_global_index(i)
-        vxyz = dic["gridf"].xyz_from_ijk(dic["ijk"][0], dic["ijk"][1], dic["ijk"][2])
-        dic["corns"] = (
-            f"{vxyz[0][0]}, {dic['dims'][2] -vxyz[2][0]}, {vxyz[0][1]}, "
-            + f"{dic['dims'][2] -vxyz[2][1]}, {vxyz[0][5]}, {dic['dims'][2] -vxyz[2][5]},"
-            + f" {vxyz[0][4]}, {dic['dims'][2] - vxyz[2][4]}"
-        )
-        pxyz = Polygon(
-            [
-                [vxyz[0][0], vxyz[2][0]],
-                [vxyz[0][1], vxyz[2][1]],
-                [vxyz[0][5], vxyz[2][5]],
-                [vxyz[0][4], vxyz[2][4]],
-                [vxyz[0][0], vxyz[2][0]],
-            ]
-        ).centroid.wkt
-        dic["xyz"] = list(float(j) for j in pxyz[7:-1].split(" "))
-        dic["xyz"].insert(1, 0.0)
-    else:
-        dic["xyz"] = dic["gridf"].get_xyz(global_index=i)
-        dic["ijk"] = dic["gridf"].get_ijk(global_index=i)
-        vxyz = dic["gridf"].export_corners(dic["gridf"].export_index())[i]
-        dic["corns"] = (
-            f"{vxyz[0]}, {dic['dims'][2] -vxyz[2]}, {vxyz[3]}, "
-            + f"{dic['dims'][2] -vxyz[5]}, {vxyz[15]}, {dic['dims'][2] -vxyz[17]}, "
-            + f"{vxyz[12]}, {dic['dims'][2] - vxyz[14]}"
+    centers = np.column_stack(
+        (x_c.ravel(), np.full(x_c.size, dic["ymy_center"][0]), z_c.ravel())
+    )
+    x_l, z_t = np.meshgrid(dic["xmx"][:-1], dic["dims"][2] - dic["zmz"][:-1])
+    x_r, z_b = np.meshgrid(dic["xmx"][1:], dic["dims"][2] - dic["zmz"][1:])
+    corners = np.column_stack(
+        [val.ravel() for val in [x_l, z_t, x_r, z_t, x_r, z_b, x_l, z_b]]
+    )
+    return centers, corners
+
+
+def corner_point_centers_corners(dic):
+    """
+    Get the centers and corners (in the x-z plane) of the corner-point cells
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        centers (array): Floats with the x, y, and z positions of the cell centers\n
+        corners (array): Floats with the x and z positions of the cell corners
+
+    """
+    centers = np.column_stack(
+        (
+            dic["cell_xyz"][:, 0],
+            np.full(dic["no_cells"], dic["ymy_center"][0]),
+            dic["cell_xyz"][:, 2],
         )
+    )
+    corners = np.stack((dic["cell_xcor"], dic["dims"][2] - dic["cell_zcor"]), axis=-1)
+    return centers, corners[:, [0, 1, 5, 4]].reshape(-1, 8)
+
+
+def write_centers_corners(dic, centers, corners):
+    """
+    Write the cell centers and corners used in the data postprocessing as .npy
+    arrays, and also as text files if requested
+
+    Args:
+        dic (dict): Global dictionary\n
+        centers (array): Floats with the x, y, and z positions of the cell centers\n
+        corners (array): Floats with the x and z positions of the cell corners
+
+    Returns:
+        None
+
+    """
+    for name, values in zip(["centers", "corners"], [centers, corners]):
+        np.save(f"{dic['exe']}/{dic['fol']}/deck/{name}.npy", values)
+        if dic["text"]:
+            with open(
+                f"{dic['exe']}/{dic['fol']}/deck/{name}.txt",
+                "w",
+                encoding="utf8",
+            ) as file:
+                file.write(
+                    "\n".join(
+                        ", ".join(str(val) for val in row) for row in values.tolist()
+                    )
+                )
 
 
 def corner_point_handling_spe11bc(dic):
@@ -480,123 +383,34 @@ def corner_point_handling_spe11bc(dic):
         dic (dict): Modified global dictionary
 
     """
-    well1, well2, sensor1, sensor2, xtemp, ztemp, centers, corners, pv_l = (
-        [],
-        [],
-        [],
-        [],
-        [],
-        [],
-        [],
-        [],
-        0,
-    )
     dic["wellijk"] = [[] for _ in range(len(dic["wellCoord"]))]
-    for i in range(dic["no_cells"]):
-        get_cell_info(dic, i)
-        xtemp.append(dic["xyz"][0])
-        ztemp.append(dic["xyz"][2])
-        fgl = pd.Series(
-            ((dic["cxc1"] - dic["xyz"][0]) ** 2 + (dic["czc1"] - dic["xyz"][2]) ** 2)
-        ).argmin()
-        well1.append(
-            (dic["wellCoord"][0][0] - dic["xyz"][0]) ** 2
-            + (dic["wellCoord"][0][2] - dic["xyz"][2]) ** 2
-        )
-        well2.append(
-            (dic["wellCoord"][1][0] - dic["xyz"][0]) ** 2
-            + (dic["wellCoord"][1][2] - dic["xyz"][2]) ** 2
-        )
-        sensor1.append(
-            (dic["xyz"][0] - dic["sensors"][0][0]) ** 2
-            + (dic["xyz"][2] + dic["sensors"][0][2] - dic["dims"][2]) ** 2
-        )
-        sensor2.append(
-            (dic["xyz"][0] - dic["sensors"][1][0]) ** 2
-            + (dic["xyz"][2] + dic["sensors"][1][2] - dic["dims"][2]) ** 2
-        )
-        z_c = dic["xyz"][2]
-        if dic["spe11"] == "spe11c":
-            z_c -= map_z(dic, dic["ijk"][1])
-        dic["satnum"].append(dic["ids_gmsh"][fgl][0])
-        boxes(dic, dic["xyz"][0], z_c, dic["ijk"][0], dic["satnum"][-1])
-        dic["permx"].append(dic["rock"][int(dic["ids_gmsh"][fgl][0]) - 1][0])
-        poro = dic["rock"][int(dic["ids_gmsh"][fgl][0]) - 1][1]
-        dic["poro"].append(poro)
-        pv = float(poro) * (dic["pvAdded"] + dic["widthBuffer"])
-        dic["disperc"].append(f"{dic['dispersion'][int(dic['ids_gmsh'][fgl][0])-1]}")
-        dic["thconr"].append(f"{dic['rockCond'][int(dic['ids_gmsh'][fgl][0])-1][0]}")
-        if dic["ijk"][0] == 0 and (
-            int(dic["ids_gmsh"][fgl][0]) != 1 and int(dic["ids_gmsh"][fgl][0]) != 7
-        ):
-            dic["porv"].append(
-                f"PORV { pv*dic['d_y'][0]*dic['d_z'][i]} 1 1 1 1 "
-                + f"{dic['ijk'][2]+1} {dic['ijk'][2]+1} /"
-            )
-            pv_l = pv
-        elif dic["ijk"][0] == dic["noCells"][0] - 1 and (
-            int(dic["ids_gmsh"][fgl][0]) != 1 and int(dic["ids_gmsh"][fgl][0]) != 7
-        ):
-            dic["porv"].append(
-                f"PORV {pv*dic['d_y'][0]*dic['d_z'][i]} {dic['noCells'][0]} "
-                + f"{dic['noCells'][0]} 1 1 {dic['ijk'][2]+1} {dic['ijk'][2]+1} /"
-            )
-        centers.append(str([dic["xyz"][0], dic["ymy_center"][0], dic["xyz"][2]])[1:-1])
-        corners.append(dic["corns"])
-        if dic["ijk"][0] > 0 and dic["ijk"][0] == dic["noCells"][0] - 1:
-            for j in range(dic["noCells"][1] - 1):
-                for names in ["satnum", "poro", "permx", "disperc", "thconr"]:
-                    dic[f"{names}"].extend(dic[f"{names}"][-dic["noCells"][0] :])
-                for i_i in range(dic["noCells"][0]):
-                    z_c = ztemp[i_i]
-                    if dic["spe11"] == "spe11c":
-                        z_c -= map_z(dic, j + 1)
-                    boxes(
-                        dic,
-                        xtemp[i_i],
-                        z_c,
-                        i_i,
-                        dic["satnum"][-dic["noCells"][0] + i_i],
-                    )
-                    if i_i == 0 and (
-                        int(dic["satnum"][-dic["noCells"][0] + i_i]) != 1
-                        and int(dic["satnum"][-dic["noCells"][0] + i_i]) != 7
-                    ):
-                        dic["d_zl"] = dic["d_z"][-dic["noCells"][0] + 1 + i]
-                        dic["porv"].append(
-                            "PORV "
-                            + f"{pv_l*dic['d_y'][j+1]*dic['d_zl']} 1 1 "
-                            + f"{j+2} {j+2} {dic['ijk'][2]+1} {dic['ijk'][2]+1} /"
-                        )
-                    elif i_i == dic["noCells"][0] - 1 and (
-                        int(dic["satnum"][-dic["noCells"][0] + i_i]) != 1
-                        and int(dic["satnum"][-dic["noCells"][0] + i_i]) != 7
-                    ):
-                        dic["porv"].append(
-                            f"PORV {pv*dic['d_y'][j+1]*dic['d_z'][i]} "
-                            + f"{dic['noCells'][0]} {dic['noCells'][0]} {j+2} {j+2} "
-                            + f"{dic['ijk'][2]+1} {dic['ijk'][2]+1} /"
-                        )
-            xtemp, ztemp = [], []
-    if dic["spe11"] == "spe11c":
-        add_pv_fipnum_front_back(dic)
-    dic["pop1"] = pd.Series(sensor1).argmin()
-    dic["pop2"] = pd.Series(sensor2).argmin()
-    dic["well1"] = pd.Series(well1).argmin()
-    dic["well2"] = pd.Series(well2).argmin()
+    x_c, z_c = dic["cell_xyz"][:, 0], dic["cell_xyz"][:, 2]
+    facies = dic["ids_facies"][find_facies(dic, x_c, z_c)]
+    set_properties(dic, facies)
+    fipnums(dic, x_c, z_c, facies)
+    add_pv_boundaries(
+        dic,
+        facies,
+        dic["d_x"],
+        dic["d_y"],
+        np.reshape(dic["d_z"], (dic["noCells"][2], dic["noCells"][0])),
+    )
+    dic["pop1"] = pd.Series(
+        (x_c - dic["sensors"][0][0]) ** 2
+        + (z_c + dic["sensors"][0][2] - dic["dims"][2]) ** 2
+    ).argmin()
+    dic["pop2"] = pd.Series(
+        (x_c - dic["sensors"][1][0]) ** 2
+        + (z_c + dic["sensors"][1][2] - dic["dims"][2]) ** 2
+    ).argmin()
+    dic["well1"] = pd.Series(
+        (dic["wellCoord"][0][0] - x_c) ** 2 + (dic["wellCoord"][0][2] - z_c) ** 2
+    ).argmin()
+    dic["well2"] = pd.Series(
+        (dic["wellCoord"][1][0] - x_c) ** 2 + (dic["wellCoord"][1][2] - z_c) ** 2
+    ).argmin()
     locate_wells_sensors(dic)
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/centers.txt",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write("\n".join(centers))
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/corners.txt",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write("\n".join(corners))
+    write_centers_corners(dic, *corner_point_centers_corners(dic))
 
 
 def locate_wells_sensors(dic):
@@ -610,16 +424,10 @@ def locate_wells_sensors(dic):
         dic (dict): Modified global dictionary
 
     """
-    if dic["use"] == "opm":
-        well1ijk = dic["gridf"].ijk_from_global_index(dic["well1"])
-        well2ijk = dic["gridf"].ijk_from_global_index(dic["well2"])
-        dic["sensorijk"][0] = list(dic["gridf"].ijk_from_global_index(dic["pop1"]))
-        dic["sensorijk"][1] = list(dic["gridf"].ijk_from_global_index(dic["pop2"]))
-    else:
-        well1ijk = dic["gridf"].get_ijk(global_index=dic["well1"])
-        well2ijk = dic["gridf"].get_ijk(global_index=dic["well2"])
-        dic["sensorijk"][0] = list(dic["gridf"].get_ijk(global_index=dic["pop1"]))
-        dic["sensorijk"][1] = list(dic["gridf"].get_ijk(global_index=dic["pop2"]))
+    well1ijk = dic["cell_ijk"][dic["well1"]].tolist()
+    well2ijk = dic["cell_ijk"][dic["well2"]].tolist()
+    dic["sensorijk"][0] = dic["cell_ijk"][dic["pop1"]].tolist()
+    dic["sensorijk"][1] = dic["cell_ijk"][dic["pop2"]].tolist()
     dic["wellijk"][0] = [well1ijk[0] + 1, 1, well1ijk[2] + 1]
     dic["wellijk"][1] = [well2ijk[0] + 1, 1, well2ijk[2] + 1]
     # Work in process to implement properly this for the corner-point grid in spe11c
@@ -639,10 +447,7 @@ def locate_wells_sensors(dic):
         dic["wellijkf"][0][1] = wjf
         dic["wellijkf"][1][1] = wjf
         dic["wellkh"] = []
-        z_centers = []
-        for k in range(dic["noCells"][2]):
-            get_cell_info(dic, well1ijk[0] + k * dic["noCells"][0])
-            z_centers.append(dic["xyz"][2])
+        z_centers = dic["cell_xyz"][well1ijk[0] :: dic["nxyzf"][0], 2]
         for j in range(dic["wellijk"][0][1], dic["wellijkf"][0][1] + 1):
             midpoints = z_centers - map_z(dic, j - 1)
             dic["wellkh"].append(
@@ -659,76 +464,113 @@ def locate_wells_sensors(dic):
         dic["sensorijk"][0][0]
         + dic["sensorijk"][0][1] * dic["noCells"][0]
         + dic["sensorijk"][0][2] * dic["noCells"][0] * dic["noCells"][1]
-    ] = "8"
+    ] = 8
     dic["fipnum"][
         dic["sensorijk"][1][0]
         + dic["sensorijk"][1][1] * dic["noCells"][0]
         + dic["sensorijk"][1][2] * dic["noCells"][0] * dic["noCells"][1]
-    ] = "9"
+    ] = 9
 
 
-def boxes(dic, x_c, z_c, idx, satnum):
+def extrude(dic, values):
     """
-    Find the global indices for the different boxes for the report data
+    Extrude the values in the x-z slab of cells along the y axis
 
     Args:
         dic (dict): Global dictionary\n
-        x_c (float): x-position of the cell center\n
-        z_c (float): z-position of the cell center\n
-        idx (int): i index of the cell position\n
-        satnum (int): Number of the facie in the cell
+        values (array): Values in the slab ordered with the i index running fastest
+
+    Returns:
+        values (array): Read-only view with shape (nz, ny, nx) of the values
+
+    """
+    n_y = 1 if dic["spe11"] == "spe11a" else dic["noCells"][1]
+    shape = (dic["noCells"][2], n_y, dic["noCells"][0])
+    return np.broadcast_to(np.reshape(values, (shape[0], 1, shape[2])), shape)
+
+
+def set_properties(dic, satnum):
+    """
+    Set the satnum and rock properties of all cells from the facies in the x-z slab
+
+    Args:
+        dic (dict): Global dictionary\n
+        satnum (array): Integers with the facie in the cells in the slab
 
     Returns:
         dic (dict): Modified global dictionary
 
     """
-    if (
-        (dic["dims"][2] + dic["maxelevation"] - z_c >= dic["boxb"][0][2])
-        & (dic["dims"][2] + dic["maxelevation"] - z_c <= dic["boxb"][1][2])
-        & (x_c >= dic["boxb"][0][0])
-        & (x_c <= dic["boxb"][1][0])
-    ):
-        check_facie1(dic, satnum, "6", "3")
-    elif (
-        (dic["dims"][2] + dic["maxelevation"] - z_c >= dic["boxc"][0][2])
-        & (dic["dims"][2] + dic["maxelevation"] - z_c <= dic["boxc"][1][2])
-        & (x_c >= dic["boxc"][0][0])
-        & (x_c <= dic["boxc"][1][0])
-    ):
-        check_facie1(dic, satnum, "12", "4")
-    elif (
-        (dic["dims"][2] + dic["maxelevation"] - z_c >= dic["boxa"][0][2])
-        & (dic["dims"][2] + dic["maxelevation"] - z_c <= dic["boxa"][1][2])
-        & (x_c >= dic["boxa"][0][0])
-        & (x_c <= dic["boxa"][1][0])
-    ):
-        check_facie1(dic, satnum, "5", "2")
-    elif dic["spe11"] != "spe11a" and idx in (0, dic["noCells"][0] - 1):
-        check_facie1(dic, satnum, "10", "11")
-    elif satnum == "1":
-        dic["fipnum"].append("7")
-    else:
-        dic["fipnum"].append("1")
+    dic["satnum"] = extrude(dic, satnum).astype(np.int32).flatten()
+    ind = dic["satnum"] - 1
+    rock = np.array(dic["rock"], dtype=float)
+    dic["permx"] = rock[ind, 0]
+    dic["poro"] = rock[ind, 1]
+    dic["disperc"] = np.array(dic["dispersion"], dtype=float)[ind]
+    if dic["spe11"] != "spe11a":
+        dic["thconr"] = np.array(dic["rockCond"], dtype=float)[ind, 0]
 
 
-def check_facie1(dic, satnum, numa, numb):
+def fipnums(dic, x_c, z_c, satnum):
     """
-    Handle the overlaping with facie 1
+    Set the fipnums of all cells by extruding the x-z slab of cell centers along y
 
     Args:
         dic (dict): Global dictionary\n
-        satnum (int): Number of the facie in the cell\n
-        numa (int): Fipnum to assign to the cell if it overlaps with Facie 1\n
-        numb (int): Fipnum to assign to the cell otherwise.
+        x_c (array): Floats with the x-positions of the cell centers in the slab\n
+        z_c (array): Floats with the z-positions of the cell centers in the slab\n
+        satnum (array): Integers with the facie in the cells in the slab
 
     Returns:
         dic (dict): Modified global dictionary
 
     """
-    if satnum == "1":
-        dic["fipnum"].append(numa)
-    else:
-        dic["fipnum"].append(numb)
+    z_c = extrude(dic, z_c)
+    if dic["spe11"] == "spe11c":
+        z_c = z_c - np.reshape(map_z(dic, np.arange(z_c.shape[1])), (1, -1, 1))
+    dic["fipnum"] = (
+        boxes(
+            dic,
+            extrude(dic, x_c),
+            z_c,
+            np.broadcast_to(np.arange(dic["noCells"][0]), z_c.shape),
+            extrude(dic, satnum),
+        )
+        .astype(np.int32)
+        .flatten()
+    )
+
+
+def boxes(dic, x_c, z_c, idx, satnum):
+    """
+    Find the fipnums for the different boxes for the report data
+
+    Args:
+        dic (dict): Global dictionary\n
+        x_c (array): Floats with the x-positions of the cell centers\n
+        z_c (array): Floats with the z-positions of the cell centers\n
+        idx (array): Integers with the i indices of the cell positions\n
+        satnum (array): Integers with the facie in the cells
+
+    Returns:
+        fipnum (array): Integers with the fipnum of the cells
+
+    """
+    depth = dic["dims"][2] + dic["maxelevation"] - z_c
+    facie1 = satnum == 1
+    conditions, choices = [], []
+    for name, numa, numb in zip(["boxb", "boxc", "boxa"], [6, 12, 5], [3, 4, 2]):
+        conditions.append(
+            (depth >= dic[name][0][2])
+            & (depth <= dic[name][1][2])
+            & (x_c >= dic[name][0][0])
+            & (x_c <= dic[name][1][0])
+        )
+        choices.append(np.where(facie1, numa, numb))
+    if dic["spe11"] != "spe11a":
+        conditions.append((idx == 0) | (idx == dic["noCells"][0] - 1))
+        choices.append(np.where(facie1, 10, 11))
+    return np.select(conditions, choices, np.where(facie1, 7, 1))
 
 
 def positions(dic):
@@ -743,39 +585,24 @@ def positions(dic):
 
     """
     dic["sensorijk"] = [[] for _ in range(len(dic["sensors"]))]
-    getfacies(dic)
-    for names in ["satnum", "poro", "permx", "thconr", "fipnum", "disperc", "porv"]:
-        dic[f"{names}"] = []
+    with timer(dic, "facies"):
+        getfacies(dic)
+    dic["porv"] = []
     if dic["grid"] == "corner-point":
-        if dic["use"] == "opm":
-            dic["gridf"] = OpmGrid(f"{dic['exe']}/{dic['fol']}/flow/INITIAL.EGRID")
-            dic["initf"] = OpmFile(f"{dic['exe']}/{dic['fol']}/flow/INITIAL.INIT")
-            dic["no_cells"] = (
-                dic["gridf"].dimension[0]
-                * dic["gridf"].dimension[1]
-                * dic["gridf"].dimension[2]
-            )
-            dic["pv"] = dic["initf"]["PORV"]
-            dic["actind"] = list(i for i in range(dic["no_cells"]) if dic["pv"][i] > 0)
-            dic["d_z"] = np.array([0.0] * dic["no_cells"])
-            dic["d_z"][dic["actind"]] = list(dic["initf"]["DZ"])
-        else:
-            dic["gridf"] = Grid(f"{dic['exe']}/{dic['fol']}/flow/INITIAL.EGRID")
-            dic["initf"] = ResdataFile(f"{dic['exe']}/{dic['fol']}/flow/INITIAL.INIT")
-            dic["actnum"] = list(dic["gridf"].export_actnum())
-            dic["no_cells"] = dic["gridf"].nx * dic["gridf"].ny * dic["gridf"].nz
-            dic["actind"] = list(i for i, act in enumerate(dic["actnum"]) if act == 1)
-            dic["d_z"] = np.array([0.0] * dic["no_cells"])
-            dic["d_z"][dic["actind"]] = list(dic["initf"].iget_kw("DZ")[0])
-        if dic["spe11"] == "spe11a":
-            corner_point_handling_spe11a(dic)
-        else:
-            corner_point_handling_spe11bc(dic)
+        with timer(dic, "geometry"):
+            grid_cache(dic)
+            cell_geometry(dic)
+        with timer(dic, "handling"):
+            if dic["spe11"] == "spe11a":
+                corner_point_handling_spe11a(dic)
+            else:
+                corner_point_handling_spe11bc(dic)
     else:
-        if dic["spe11"] == "spe11a":
-            structured_handling_spe11a(dic)
-        else:
-            structured_handling_spe11bc(dic)
+        with timer(dic, "handling"):
+            if dic["spe11"] == "spe11a":
+                structured_handling_spe11a(dic)
+            else:
+                structured_handling_spe11bc(dic)
     np.savetxt(
         f"{dic['exe']}/{dic['fol']}/deck/ycenters.txt", dic["ymy_center"], fmt="%.8E"
     )
@@ -891,7 +718,8 @@ def map_z(dic, j):
 
 def getfacies(dic):
     """
-    Function to read the reference Gmsh file
+    Function to build the facies polygons from the reference Gmsh geometry, using
+    the cached polygons if the geometry file and case dimensions have not changed
 
     Args:
         dic (dict): Global dictionary
@@ -900,101 +728,127 @@ def getfacies(dic):
         dic (dict): Modified global dictionary
 
     """
-    for ent in ["cxc1", "czc1", "ids_gmsh"]:
-        dic[ent] = []
-    # Read the points for the reference mesh file
-    lol, points, simplex, centr, centrxz = ([], [], [], [], [])
-    h_f_c, l_f_c = 0, 0
-
     if dic["spe11"] == "spe11a":
         h_ref = 1.2
         l_ref = 2.8
     else:
         h_ref = 1200.0
         l_ref = 8400.0
-    with open(
-        f"{dic['pat']}/reference_mesh/facies_coordinates.msh",
-        "r",
-        encoding="utf8",
-    ) as file:
-        for row in csv.reader(file, delimiter=" "):
-            lol.append(row)
-    for i in range(int(lol[14][0])):
-        points.append(lol[15 + i][1:3])
-        l_f_c, h_f_c = max(l_f_c, float(lol[15 + i][1])), max(
-            h_f_c, float(lol[15 + i][2])
-        )
+    geo = f"{dic['pat']}/reference_mesh/facies_coordinates.geo"
+    sha = hashlib.sha256(f"{MESH_CACHE} {dic['dims']} {l_ref} {h_ref}".encode())
+    with open(geo, "rb") as file:
+        sha.update(file.read())
+    cache = f"{dic['cache']}/facies_v{MESH_CACHE}_{sha.hexdigest()[:16]}.npz"
+    facies = None
+    if os.path.isfile(cache):
+        try:
+            with np.load(cache) as values:
+                facies = [values[name] for name in ["ids", "coords", "offsets"]]
+        except (OSError, ValueError, EOFError, KeyError, BadZipFile):
+            print(f"The facies cache {cache} is not valid, building it again")
+    if facies is None:
+        facies = read_geo(dic, geo, l_ref, h_ref)
+        try:
+            os.makedirs(dic["cache"], exist_ok=True)
+            # Written with another name first, so other processes never read it partly
+            with open(f"{cache}.{os.getpid()}", "wb") as file:
+                np.savez(file, ids=facies[0], coords=facies[1], offsets=facies[2])
+            os.replace(f"{cache}.{os.getpid()}", cache)
+        except OSError:
+            print(f"The facies cache could not be written in {dic['cache']}")
+    ids, coords, offsets = facies
+    dic["ids_facies"] = ids
+    dic["facies_polygons"] = polygons(
+        linearrings(coords, indices=np.repeat(np.arange(len(ids)), np.diff(offsets)))
+    )
+    prepare(dic["facies_polygons"])
 
-    for i in range(int(lol[int(lol[14][0]) + 17][0])):
-        dic["ids_gmsh"].append(lol[int(lol[14][0]) + 18 + i][3])
-        simplex.append(lol[int(lol[14][0]) + 18 + i][5:])
-        simplex[-1].insert(0, int(lol[int(lol[14][0]) + 18 + i][1]))
 
-    for i, _ in enumerate(simplex):
-        if simplex[i][0] == 2:
-            centr.append(
-                Polygon(
-                    [
-                        [
-                            float(points[int(simplex[i][1]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][1]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                        [
-                            float(points[int(simplex[i][2]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][2]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                        [
-                            float(points[int(simplex[i][3]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][3]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                        [
-                            float(points[int(simplex[i][1]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][1]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                    ]
-                ).centroid.wkt
-            )
-        else:
-            centr.append(
-                Polygon(
-                    [
-                        [
-                            float(points[int(simplex[i][1]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][1]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                        [
-                            float(points[int(simplex[i][2]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][2]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                        [
-                            float(points[int(simplex[i][3]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][3]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                        [
-                            float(points[int(simplex[i][4]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][4]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                        [
-                            float(points[int(simplex[i][1]) - 1][0]) * l_ref / l_f_c,
-                            dic["dims"][2]
-                            - float(points[int(simplex[i][1]) - 1][1]) * h_ref / h_f_c,
-                        ],
-                    ]
-                ).centroid.wkt
+def read_geo(dic, geo, l_ref, h_ref):
+    """
+    Parse the points, lines, and outer curve loops of the facies surfaces in the
+    reference Gmsh geometry, and scale the polygon vertices to the case dimensions
+
+    Args:
+        dic (dict): Global dictionary\n
+        geo (str): Path to the reference Gmsh geometry\n
+        l_ref (float): Length of the case [m]\n
+        h_ref (float): Height of the case [m]
+
+    Returns:
+        ids (array): Integers with the facies of the polygons\n
+        coords (array): Floats with the x and z coordinates of the polygon vertices\n
+        offsets (array): Integers with the first vertex of each polygon
+
+    """
+    nodes, lines, loops, surfaces, ids, coords, offsets = {}, {}, {}, {}, [], [], [0]
+    with open(geo, "r", encoding="utf8") as file:
+        for row in file:
+            name, _, values = row.partition(" = {")
+            if "(" not in name or not values:
+                continue
+            entity, number = name[: name.index("(")], name[name.index("(") + 1 : -1]
+            values = values.split("}")[0]
+            if entity == "Point":
+                nodes[int(number)] = [float(value) for value in values.split(",")[:2]]
+            elif entity == "Line":
+                lines[int(number)] = [int(value) for value in values.split(",")]
+            elif entity == "Curve Loop" and "#" not in values:
+                loops[int(number)] = [int(value) for value in values.split(",")]
+            elif entity == "Plane Surface":
+                surfaces[int(number)] = int(values.split(",")[0])
+            elif entity == "Physical Surface":
+                for surface in values.split(","):
+                    ids.append(int(number.split(",")[1]))
+                    for line in loops[surfaces[int(surface)]]:
+                        coords.append(nodes[lines[abs(line)][int(line < 0)]])
+                    offsets.append(len(coords))
+    coords = np.array(coords)
+    l_f_c, h_f_c = np.array(list(nodes.values())).max(axis=0)
+    coords[:, 0] = coords[:, 0] * l_ref / l_f_c
+    coords[:, 1] = dic["dims"][2] - coords[:, 1] * h_ref / h_f_c
+    return np.array(ids), coords, np.array(offsets)
+
+
+def find_facies(dic, x_c, z_c):
+    """
+    Find the facies polygon containing each of the given cell centers (starting
+    from the largest polygons), or the closest one for centers outside all polygons
+
+    Args:
+        dic (dict): Global dictionary\n
+        x_c (array): Floats with the x-positions of the cell centers\n
+        z_c (array): Floats with the z-positions of the cell centers
+
+    Returns:
+        fgl (array): Integers with the indices of the facies polygons
+
+    """
+    with timer(dic, "facies_lookup"):
+        x_c, z_c = np.asarray(x_c, dtype=float), np.asarray(z_c, dtype=float)
+        fgl = np.full(len(x_c), -1)
+        limits = bounds(dic["facies_polygons"])
+        for i in np.argsort(-area(dic["facies_polygons"]), kind="stable"):
+            left = np.flatnonzero(fgl < 0)
+            left = left[
+                (x_c[left] >= limits[i, 0])
+                & (x_c[left] <= limits[i, 2])
+                & (z_c[left] >= limits[i, 1])
+                & (z_c[left] <= limits[i, 3])
+            ]
+            fgl[
+                left[intersects_xy(dic["facies_polygons"][i], x_c[left], z_c[left])]
+            ] = i
+        missing = np.flatnonzero(fgl < 0)
+        if missing.size > 0:
+            fgl[missing] = np.argmin(
+                distance(
+                    points(x_c[missing], z_c[missing])[:, None],
+                    dic["facies_polygons"][None, :],
+                ),
+                axis=1,
             )
-        centrxz.append([float(j) for j in centr[i][7:-1].split(" ")])
-        dic["cxc1"].append(centrxz[i][0])
-        dic["czc1"].append(centrxz[i][1])
-    dic["cxc1"] = np.array(dic["cxc1"])
-    dic["czc1"] = np.array(dic["czc1"])
+    return fgl
 
 
 def get_lines(dic):
@@ -1023,11 +877,11 @@ def get_lines(dic):
                 newline = False
             for i, column in enumerate(row):
                 if column == "{":
-                    points = row[i + 1 :].split(",")
+                    coords = row[i + 1 :].split(",")
                     lines[-1].append(
                         [
-                            float(points[0]) * dic["dims"][0] / 2.8,
-                            (1.2 - float(points[1]) - float(points[2][:-3]))
+                            float(coords[0]) * dic["dims"][0] / 2.8,
+                            (1.2 - float(coords[1]) - float(coords[2][:-3]))
                             * dic["dims"][2]
                             / 1.2,
                         ]
@@ -1073,36 +927,25 @@ def corner(dic):
             dic["ymy"], len(dic["ymy"]) - 1, dic["ymy"][-1] - dic["widthBuffer"]
         )
     dic["noCells"][1] = len(dic["ymy"]) - 1
-    for xcor in dic["xmx"]:
-        for _, lcor in enumerate(lines):
-            dic["xcor"].append(xcor)
-            idx = pd.Series([abs(ii[0] - xcor) for ii in lcor]).argmin()
-            if lcor[idx][0] < xcor:
-                dic["zcor"].append(
-                    lcor[idx][1]
-                    + (
-                        (lcor[idx + 1][1] - lcor[idx][1])
-                        / (lcor[idx + 1][0] - lcor[idx][0])
-                    )
-                    * (xcor - lcor[idx][0])
-                )
-            else:
-                dic["zcor"].append(
-                    lcor[idx - 1][1]
-                    + (
-                        (lcor[idx][1] - lcor[idx - 1][1])
-                        / (lcor[idx][0] - lcor[idx - 1][0])
-                    )
-                    * (xcor - lcor[idx - 1][0])
-                )
-    res = list(filter(lambda i: i == dic["zcor"][-1], dic["zcor"]))[0]
-    n_z = dic["zcor"].index(res)
-    res = list(filter(lambda i: i > 0, dic["xcor"]))[0]
-    n_x = round(len(dic["xcor"]) / dic["xcor"].index(res)) - 1
-    dic["noCells"][0], dic["noCells"][2] = n_x, n_z
+    xmx = np.array(dic["xmx"], dtype=float)
+    zcor = np.empty((len(xmx), len(lines)))
+    for n, lcor in enumerate(lines):
+        lcor = np.array(lcor)
+        # Segment starting at the closest point on its left (the last segment
+        # wraps around to the first point as in the Python indexing)
+        idx = np.argmin(np.abs(lcor[:, 0][:, None] - xmx), axis=0)
+        idx -= lcor[idx, 0] >= xmx
+        zcor[:, n] = lcor[idx, 1] + (
+            (lcor[idx + 1, 1] - lcor[idx, 1]) / (lcor[idx + 1, 0] - lcor[idx, 0])
+        ) * (xmx - lcor[idx, 0])
+    dic["noCells"][0], dic["noCells"][2] = len(xmx) - 1, len(lines) - 1
     # Refine the grid
     dic["xcor"], dic["zcor"], dic["noCells"][0], dic["noCells"][2] = refinement_z(
-        dic["xcor"], dic["zcor"], dic["noCells"][0], dic["noCells"][2], dic["z_n"]
+        np.repeat(xmx, len(lines)),
+        zcor.ravel(),
+        dic["noCells"][0],
+        dic["noCells"][2],
+        dic["z_n"],
     )
     dic["xmx"] = np.array(dic["xmx"])
     dic["ymy_center"] = 0.5 * (np.array(dic["ymy"])[1:] + np.array(dic["ymy"])[:-1])
@@ -1115,36 +958,30 @@ def refinement_z(xci, zci, ncx, ncz, znr):
     Refinment of the grid in the z-dir
 
     Args:
-        xci (list): Floats with the x-coordinates of the cell corners\n
-        zci (list): Floats with the z-coordinates of the cell corners\n
+        xci (array): Floats with the x-coordinates of the cell corners\n
+        zci (array): Floats with the z-coordinates of the cell corners\n
         ncx (int): Number of cells in the x-dir\n
         ncz (int): Number of cells in the z-dir\n
         znr (list): Integers with the number of z-refinments per cell
 
     Returns:
-        xcr (list): Floats with the new x-coordinates of the cell corners\n
-        zcr (list): Floats with the new z-coordinates of the cell corners\n
+        xcr (array): Floats with the new x-coordinates of the cell corners\n
+        zcr (array): Floats with the new z-coordinates of the cell corners\n
         ncx (int): New number of cells in the x-dir\n
         ncz (int): New number of cells in the z-dir
 
     """
-    xcr, zcr = [], []
-    for j in range(ncx + 1):
-        zcr.append(zci[j * (ncz + 1)])
-        xcr.append(xci[j * (ncz + 1)])
-        for i in range(ncz):
-            for k in range(znr[i]):
-                alp = np.arange(1.0 / znr[i], 1.0 + 1.0 / znr[i], 1.0 / znr[i]).tolist()
-                zcr.append(
-                    zci[j * (ncz + 1) + i]
-                    + (zci[j * (ncz + 1) + i + 1] - zci[j * (ncz + 1) + i]) * alp[k]
-                )
-                xcr.append(
-                    xci[j * (ncz + 1) + i]
-                    + (xci[j * (ncz + 1) + i + 1] - xci[j * (ncz + 1) + i]) * alp[k]
-                )
-    res = list(filter(lambda i: i > 0, xcr))[0]
-    ncx = round(len(xcr) / xcr.index(res)) - 1
-    res = list(filter(lambda i: i == zcr[-1], zcr))[0]
-    ncz = zcr.index(res)
-    return xcr, zcr, ncx, ncz
+    znr = np.array(znr[:ncz], dtype=int)
+    lower = np.repeat(np.arange(ncz), znr)
+    alp = np.concatenate(
+        [np.arange(1.0 / nzr, 1.0 + 1.0 / nzr, 1.0 / nzr)[:nzr] for nzr in znr]
+    )
+    xcr = np.reshape(np.asarray(xci, dtype=float), (ncx + 1, ncz + 1))
+    zcr = np.reshape(np.asarray(zci, dtype=float), (ncx + 1, ncz + 1))
+    xcr = np.column_stack(
+        (xcr[:, 0], xcr[:, lower] + (xcr[:, lower + 1] - xcr[:, lower]) * alp)
+    )
+    zcr = np.column_stack(
+        (zcr[:, 0], zcr[:, lower] + (zcr[:, lower + 1] - zcr[:, lower]) * alp)
+    )
+    return xcr.ravel(), zcr.ravel(), ncx, len(alp)
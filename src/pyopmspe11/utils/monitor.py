@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""
+Utiliy functions to monitor the progress of the simulations.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+YEAR = 365.25  # Days in one year
+
+
+@contextmanager
+def monitor(dic, deck, folder):
+    """
+    Follow the INFOSTEP file while Flow is running, writing the progress, throughput,
+    failed time steps, and projected completion time in the terminal and in
+    status.json every dic["monitor"] seconds
+
+    Args:
+        dic (dict): Global dictionary\n
+        deck (str): Name of the input deck\n
+        folder (str): Name of destination of the output files
+
+    Returns:
+        None
+
+    """
+    if not dic.get("monitor"):
+        yield
+        return
+    stop = threading.Event()
+    thread = threading.Thread(target=watch, args=(dic, deck, folder, stop))
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def watch(dic, deck, folder, stop):
+    """
+    Read the new rows of the INFOSTEP file and update the status until the stop
+    event is set
+
+    Args:
+        dic (dict): Global dictionary\n
+        deck (str): Name of the input deck\n
+        folder (str): Name of destination of the output files\n
+        stop (Event): Set after Flow finishes
+
+    Returns:
+        None
+
+    """
+    path = f"{dic['exe']}/{dic['fol']}"
+    with open(f"{path}/deck/dt.txt", "r", encoding="utf8") as file:
+        lines = file.read().splitlines()
+    status = {"deck": deck, "state": "running", "steps": 0, "failed_steps": 0}
+    status.update({"newton_iterations": 0, "linear_iterations": 0})
+    status["end [d]"] = (float(lines[0]) + float(lines[2].split()[-1])) / 86400.0
+    if deck == "EQUIL":
+        status["end [d]"] = float(lines[0]) / 86400.0  # Only the no-injection period
+    status.update({"time [d]": 0.0, "progress [%]": 0.0, "rate [y/h]": None})
+    status.update({"failed_rate [-]": None, "eta": None, "wall [s]": 0.0})
+    fname = f"{path}/{folder}/{deck}.INFOSTEP"
+    info = {"begin": time.time(), "offset": 0, "first": None, "old": None}
+    if os.path.isfile(fname):
+        info["old"] = os.path.getmtime(fname)
+    while True:
+        finished = stop.wait(dic["monitor"])
+        # An INFOSTEP file from a previous simulation is skipped until Flow writes it
+        if os.path.isfile(fname) and os.path.getmtime(fname) != info["old"]:
+            if os.path.getsize(fname) < info["offset"]:
+                info["offset"] = 0
+            with open(fname, "rb") as file:
+                file.seek(info["offset"])
+                rows = file.read().decode("utf8")
+            # Only the complete rows are read, the rest is read in the next update
+            rows = rows[: rows.rfind("\n") + 1]
+            info["offset"] += len(rows.encode("utf8"))
+            update(status, info, rows.splitlines())
+        if finished:
+            status["state"] = (
+                "finished"
+                if status["time [d]"] >= status["end [d]"] * (1.0 - 1e-9)
+                else "stopped"
+            )
+        status["wall [s]"] = time.time() - info["begin"]
+        write_status(dic, status)
+        if finished:
+            break
+
+
+def update(status, info, rows):
+    """
+    Add the new rows of the INFOSTEP file to the status
+
+    Args:
+        status (dict): Progress of the simulation\n
+        info (dict): Wall time at the start and at the first row, and read bytes\n
+        rows (list): New rows of the INFOSTEP file
+
+    Returns:
+        status (dict): Modified progress of the simulation
+
+    """
+    for row in rows:
+        values = row.split()
+        if len(values) < 12 or not values[0][0].isdigit():
+            continue
+        status["steps"] += 1
+        status["failed_steps"] += int(float(values[11]) == 0)
+        status["newton_iterations"] += int(float(values[9]))
+        status["linear_iterations"] += int(float(values[10]))
+        if int(float(values[11])):
+            # The Time(day) column is the time at the start of the step
+            status["time [d]"] = max(
+                status["time [d]"], float(values[0]) + float(values[1])
+            )
+        if info["first"] is None:
+            info["first"] = [time.time(), status["time [d]"]]
+    if not status["steps"]:
+        return
+    status["progress [%]"] = 100.0 * status["time [d]"] / status["end [d]"]
+    status["failed_rate [-]"] = status["failed_steps"] / status["steps"]
+    wall = time.time() - info["first"][0]
+    if wall > 0 and status["time [d]"] > info["first"][1]:
+        rate = (status["time [d]"] - info["first"][1]) / wall  # [d/s]
+        status["rate [y/h]"] = 3600.0 * rate / YEAR
+        status["eta"] = time.strftime(
+            "%Y-%m-%d %H:%M:%S",
+            time.localtime(
+                time.time() + max(0.0, status["end [d]"] - status["time [d]"]) / rate
+            ),
+        )
+
+
+def write_status(dic, status):
+    """
+    Write the status in the terminal and (replacing the previous one) in status.json
+
+    Args:
+        dic (dict): Global dictionary\n
+        status (dict): Progress of the simulation
+
+    Returns:
+        None
+
+    """
+    text = [
+        f"{status['deck']} {status['state']}: {status['progress [%]']:.1f}% "
+        f"({status['time [d]'] / YEAR:.3g} of {status['end [d]'] / YEAR:.3g} y)"
+    ]
+    if status["rate [y/h]"] is not None:
+        text.append(f"{status['rate [y/h]']:.3g} y/h")
+    text.append(f"{status['failed_steps']} of {status['steps']} time steps failed")
+    if status["eta"] and status["state"] == "running":
+        text.append(f"ETA {status['eta']}")
+    print(", ".join(text), flush=True)
+    fname = f"{dic['exe']}/{dic['fol']}/status.json"
+    with open(f"{fname}.{os.getpid()}", "w", encoding="utf8") as file:
+        json.dump(
+            {**status, "updated": time.strftime("%Y-%m-%d %H:%M:%S")}, file, indent=1
+        )
+    os.replace(f"{fname}.{os.getpid()}", fname)
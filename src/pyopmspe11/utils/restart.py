@@ -0,0 +1,319 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""
+Utiliy functions to start the simulations from restart files.
+"""
+
+import os
+import re
+import math
+import struct
+import hashlib
+import shutil
+
+EQUIL_CACHE = 1  # Increase if the cached restart files change
+SIZES = {"INTE": 4, "REAL": 4, "LOGI": 4, "DOUB": 8, "CHAR": 8, "MESS": 0}
+
+
+def equilibration_cache(dic):
+    """
+    Set the cache folder for the restart file of the no-injection period, named
+    after a hash of the equilibration deck and the files it includes (INCLUDE and
+    IMPORT keywords), so runs with the same grid, properties, and thermal setup
+    reuse it
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        dic (dict): Modified global dictionary
+
+    """
+    deck = f"{dic['exe']}/{dic['fol']}/deck"
+    sha = hashlib.sha256(f"{EQUIL_CACHE}".encode())
+    with open(f"{deck}/EQUIL.DATA", "rb") as file:
+        text = file.read()
+    sha.update(text)
+    # Only the files included in the deck, not the other ones in the deck folder
+    names = re.findall(rb"^(?:INCLUDE|IMPORT)\s+'([^']+)'", text, re.MULTILINE)
+    for name in dict.fromkeys(name.decode() for name in names):
+        sha.update(name.encode())
+        with open(f"{deck}/{name}", "rb") as file:
+            for block in iter(lambda: file.read(1048576), b""):
+                sha.update(block)
+    dic["equil_cache"] = f"{dic['cache']}/equil_v{EQUIL_CACHE}_{sha.hexdigest()[:16]}"
+
+
+def keywords(fname, names=()):
+    """
+    Go through the keywords in a binary output file (e.g., UNRST, UNSMRY, SMSPEC),
+    reading only the headers of the Fortran records besides the data of the given
+    keywords
+
+    Args:
+        fname (str): Name of the binary file\n
+        names (list): Names of the keywords to read the data
+
+    Returns:
+        name (str): Name of the keyword\n
+        start (int): First byte\n
+        end (int): Last byte\n
+        data (bytes): Data of the keyword (empty if not in names)
+
+    """
+    size = os.path.getsize(fname)
+    with open(fname, "rb") as file:
+        while file.tell() < size:
+            start = file.tell()
+            header = record(file)[1]
+            if len(header) != 16:
+                raise ValueError(f"Invalid keyword header in {fname} at {start}")
+            name = header[:8].decode().strip()
+            count = int.from_bytes(header[8:12], "big", signed=True)
+            kind = header[12:16].decode()
+            total = count * (SIZES[kind] if kind in SIZES else int(kind[1:]))
+            data = b""
+            while total > 0:
+                length, block = record(file, name in names)
+                data += block
+                total -= length
+            yield name, start, file.tell(), data
+
+
+def report_steps(fname, complete=False):
+    """
+    Find where each report step starts and ends in a unified restart file
+
+    Args:
+        fname (str): Name of the UNRST file\n
+        complete (bool): If True, then a truncated keyword at the end is ignored,
+            and the last report step is dropped if it has less keywords than the
+            previous one (e.g., if the simulation was interrupted while writing it)
+
+    Returns:
+        steps (list): Report step number (SEQNUM), first byte, last byte, and number
+            of keywords
+
+    """
+    steps = []
+    try:
+        for name, start, end, data in keywords(fname, ["SEQNUM"]):
+            if name == "SEQNUM":
+                steps.append([int.from_bytes(data[:4], "big"), start, end, 0])
+            if steps:
+                steps[-1][2:] = [end, steps[-1][3] + 1]
+    except ValueError:
+        if not complete:
+            raise
+    if complete and len(steps) > 1 and steps[-1][3] < steps[-2][3]:
+        return steps[:-1]
+    return steps
+
+
+def record(file, read=True):
+    """
+    Read (or skip) one Fortran record
+
+    Args:
+        file (object): Binary file positioned at the start of the record\n
+        read (bool): If False, then the data are skipped
+
+    Returns:
+        length (int): Number of bytes in the record\n
+        data (bytes): Data in the record (empty if skipped)
+
+    """
+    head = file.read(4)
+    if len(head) < 4:
+        raise ValueError(f"Truncated Fortran record in {file.name}")
+    length = int.from_bytes(head, "big", signed=True)
+    if read:
+        data = file.read(length)
+    else:
+        file.seek(length, 1)
+        data = b""
+    if int.from_bytes(file.read(4), "big", signed=True) != length:
+        raise ValueError(f"Invalid Fortran record in {file.name}")
+    return length, data
+
+
+def stitch_restarts(base, continued, fname):
+    """
+    Write one unified restart file with the report steps of the base simulation
+    before the first one of the continued simulation, followed by the continued
+    simulation
+
+    Args:
+        base (str): Name of the UNRST file of the base simulation\n
+        continued (str): Name of the UNRST file of the continued simulation\n
+        fname (str): Name of the stitched UNRST file
+
+    Returns:
+        None
+
+    """
+    steps = report_steps(continued, True)
+    first = steps[0][0] if steps else 0
+    tmp = f"{fname}.{os.getpid()}"
+    with open(tmp, "wb") as out:
+        with open(base, "rb") as file:
+            for seqnum, start, end, _ in report_steps(base, True):
+                if seqnum < first:
+                    file.seek(start)
+                    copy_bytes(file, out, end - start)
+        with open(continued, "rb") as file:
+            shutil.copyfileobj(file, out, 1048576)
+    os.replace(tmp, fname)
+
+
+def stitch_summaries(base, continued, fname):
+    """
+    Write one unified summary file with the time steps of the base simulation
+    before the first one of the continued simulation, followed by the continued
+    simulation, using the specification file (SMSPEC) of the base simulation
+
+    Args:
+        base (str): Path and name (without extension) of the base simulation\n
+        continued (str): Path and name of the continued simulation\n
+        fname (str): Path and name of the stitched summary files
+
+    Returns:
+        None
+
+    """
+    specs = []
+    for case in [base, continued]:
+        specs.append(
+            {
+                name: data
+                for name, _, _, data in keywords(
+                    f"{case}.SMSPEC", ["KEYWORDS", "WGNAMES", "NAMES", "NUMS"]
+                )
+                if data
+            }
+        )
+    if specs[0] != specs[1]:
+        raise ValueError(f"The summary vectors of {base} and {continued} differ")
+    names = specs[0]["KEYWORDS"]
+    index = [names[i : i + 8] for i in range(0, len(names), 8)].index(b"TIME    ")
+    first = next(
+        (time for time, _, _ in ministeps(f"{continued}.UNSMRY", index)), math.inf
+    )
+    tmp = f"{fname}.UNSMRY.{os.getpid()}"
+    with open(tmp, "wb") as out:
+        with open(f"{base}.UNSMRY", "rb") as file:
+            for time, start, end in ministeps(f"{base}.UNSMRY", index):
+                if time < first:
+                    file.seek(start)
+                    copy_bytes(file, out, end - start)
+        with open(f"{continued}.UNSMRY", "rb") as file:
+            shutil.copyfileobj(file, out, 1048576)
+    if fname != base:
+        shutil.copyfile(f"{base}.SMSPEC", f"{fname}.SMSPEC")
+    os.replace(tmp, f"{fname}.UNSMRY")
+
+
+def ministeps(fname, index):
+    """
+    Find the time of each ministep in a unified summary file, and where its
+    keywords (SEQHDR, MINISTEP, and PARAMS) start and end
+
+    Args:
+        fname (str): Name of the UNSMRY file\n
+        index (int): Position of TIME in the PARAMS values
+
+    Returns:
+        time (float): Time of the ministep [d]\n
+        start (int): First byte\n
+        end (int): Last byte
+
+    """
+    start = 0
+    try:
+        for name, _, end, data in keywords(fname, ["PARAMS"]):
+            if name == "PARAMS":
+                yield struct.unpack(">f", data[4 * index : 4 * index + 4])[
+                    0
+                ], start, end
+                start = end
+    except ValueError:
+        pass  # Truncated at the end, e.g., if the simulation was interrupted
+
+
+def stitch_infosteps(base, continued, fname):
+    """
+    Write one INFOSTEP file with the time steps of the base simulation before the
+    first one of the continued simulation, followed by the continued simulation
+
+    Args:
+        base (str): Name of the INFOSTEP file of the base simulation\n
+        continued (str): Name of the INFOSTEP file of the continued simulation\n
+        fname (str): Name of the stitched INFOSTEP file
+
+    Returns:
+        None
+
+    """
+    with open(continued, "r", encoding="utf8") as file:
+        rows = file.readlines()
+    first = float(rows[1].split()[0]) if len(rows) > 1 else math.inf
+    with open(base, "r", encoding="utf8") as file:
+        lines = file.readlines()
+    lines = lines[:1] + [
+        row
+        for row in lines[1:]
+        if len(row.split()) == len(lines[0].split()) and float(row.split()[0]) < first
+    ]
+    with open(f"{fname}.{os.getpid()}", "w", encoding="utf8") as file:
+        file.write("".join(lines + rows[1:]))
+    os.replace(f"{fname}.{os.getpid()}", fname)
+
+
+def restart_deck(source, target, base, step):
+    """
+    Write a deck restarting from a report step of a unified restart file, with the
+    same changes as in the templates for the simulations after the no-injection
+    period (UNIFIN, RESTART instead of the initialization, and SKIPREST to skip the
+    schedule up to the report step)
+
+    Args:
+        source (str): Name of the deck\n
+        target (str): Name of the restart deck\n
+        base (str): Name of the UNRST file (without extension) in the deck folder\n
+        step (int): Report step to restart from
+
+    Returns:
+        None
+
+    """
+    with open(source, "r", encoding="utf8") as file:
+        deck = file.read()
+    if "\nRESTART\n" not in deck:
+        deck = deck.replace("\nUNIFOUT\n", "\nUNIFOUT\nUNIFIN\n", 1)
+        deck = re.sub(r"\nEQUIL\n[^\n]*/\n", "\nRESTART\n'EQUIL' 0 /\n", deck, 1)
+        deck = re.sub(r"(?<=\n)(RSVD|RVVD|RTEMPVD)\n[^/]*/\n\n?", "", deck)
+        deck = re.sub(r"(\nSCHEDULE\n-+\n)", r"\1SKIPREST\n\n", deck, 1)
+    deck = re.sub(r"\nRESTART\n'[^']*' \d+ /", f"\nRESTART\n'{base}' {step} /", deck)
+    with open(target, "w", encoding="utf8") as file:
+        file.write(f"-- Restart from the report step {step} of {base}.UNRST\n")
+        file.write(deck)
+
+
+def copy_bytes(source, target, size):
+    """
+    Copy a given number of bytes between files
+
+    Args:
+        source (object): Binary file to read from its current position\n
+        target (object): Binary file to write\n
+        size (int): Number of bytes
+
+    Returns:
+        None
+
+    """
+    while size > 0:
+        data = source.read(min(size, 1048576))
+        target.write(data)
+        size -= len(data)
@@ -5,7 +5,21 @@
 Utiliy functions for the simulations, data processing, and plotting.
 """
 import os
+import json
+import time
+import shutil
 import subprocess
+from pyopmspe11.utils.geometry import from_cache, to_cache
+from pyopmspe11.utils.monitor import monitor
+from pyopmspe11.utils.restart import (
+    equilibration_cache,
+    report_steps,
+    restart_deck,
+    stitch_infosteps,
+    stitch_restarts,
+    stitch_summaries,
+)
+from pyopmspe11.utils.timings import timer, write_collapsed
 
 
 def simulations(dic, deck, folder):
@@ -21,10 +35,191 @@ def simulations(dic, deck, folder):
         None
 
     """
-    os.system(
+    restart = deck != "EQUIL" and os.path.isfile(
+        f"{dic['exe']}/{dic['fol']}/deck/EQUIL.DATA"
+    )
+    if restart:
+        with timer(dic, "equilibration"):
+            equilibration(dic)
+    with monitor(dic, deck, folder):
+        run_flow(dic, deck, folder)
+    if restart and os.path.isfile(f"{dic['exe']}/{dic['fol']}/{folder}/{deck}.UNRST"):
+        # Add the no-injection period, so the data are written as for one simulation
+        stitch_restarts(
+            f"{dic['exe']}/{dic['fol']}/deck/EQUIL.UNRST",
+            f"{dic['exe']}/{dic['fol']}/{folder}/{deck}.UNRST",
+            f"{dic['exe']}/{dic['fol']}/{folder}/{deck}.UNRST",
+        )
+
+
+def run_flow(dic, deck, folder):
+    """
+    Run OPM Flow, writing its resource usage (see flow_usage)
+
+    Args:
+        dic (dict): Global dictionary\n
+        deck (str): Name of the input deck\n
+        folder (str): Name of destination of the output files
+
+    Returns:
+        None
+
+    """
+    begin = time.perf_counter()
+    with subprocess.Popen(
         f"{dic['flow']} --output-dir={dic['exe']}/{dic['fol']}/{folder} "
-        f"{dic['exe']}/{dic['fol']}/deck/{deck}.DATA & wait\n"
+        f"{dic['exe']}/{dic['fol']}/deck/{deck}.DATA & wait $!\n",
+        shell=True,
+    ) as flow:
+        flow_usage(dic, flow, deck, folder, begin)
+
+
+def flow_usage(dic, flow, deck, folder, begin):
+    """
+    Wait for the Flow process and write its wall time, CPU time (user and system),
+    peak resident memory, and exit status in usage.json in the output folder. The
+    CPU time and memory are the ones of the shell process running the flow command
+    and its finished child processes (e.g., mpirun and the local MPI ranks, where
+    the memory is the one of the largest process), and the runs of a resumed
+    simulation are added to the previous ones
+
+    Args:
+        dic (dict): Global dictionary\n
+        flow (Popen): Process running the flow command\n
+        deck (str): Name of the input deck\n
+        folder (str): Name of destination of the output files\n
+        begin (float): Value of time.perf_counter() before starting Flow
+
+    Returns:
+        returncode (int): Exit status of the flow command
+
+    """
+    usage = {"deck": deck, "wall [s]": 0.0, "user [s]": None, "system [s]": None}
+    usage.update({"maxrss [MB]": None, "exit": None})
+    if hasattr(os, "wait4"):
+        status, rusage = os.wait4(flow.pid, 0)[1:]
+        flow.returncode = (
+            -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        )
+        usage.update({"user [s]": rusage.ru_utime, "system [s]": rusage.ru_stime})
+        usage["maxrss [MB]"] = rusage.ru_maxrss / 1e3  # ru_maxrss is in KB on Linux
+    else:
+        flow.wait()
+    usage["wall [s]"] = time.perf_counter() - begin
+    usage["exit"] = flow.returncode
+    fname = f"{dic['exe']}/{dic['fol']}/{folder}/usage.json"
+    runs = []
+    if deck == "RESUME" and os.path.isfile(fname):
+        with open(fname, "r", encoding="utf8") as file:
+            runs = json.load(file)["runs"]
+    runs.append(usage)
+    total = {"runs": runs, "exit": usage["exit"]}
+    for name in ["wall [s]", "user [s]", "system [s]", "maxrss [MB]"]:
+        values = [run[name] for run in runs if run[name] is not None]
+        total[name] = (
+            (max if name == "maxrss [MB]" else sum)(values) if values else None
+        )
+    with open(fname, "w", encoding="utf8") as file:
+        json.dump(total, file, indent=1)
+    return flow.returncode
+
+
+def equilibration(dic):
+    """
+    Copy the restart file of the no-injection period from the cache folder to the
+    deck folder, running it first if it is not in the cache folder
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        None
+
+    """
+    equilibration_cache(dic)
+    if from_cache(dic, ["EQUIL.UNRST"], dic["equil_cache"]):
+        return
+    simulations(dic, "EQUIL", "equil")
+    if not os.path.isfile(f"{dic['exe']}/{dic['fol']}/equil/EQUIL.UNRST"):
+        raise ValueError(f"Invalid result: see {dic['exe']}/{dic['fol']}/equil")
+    to_cache(dic, ["EQUIL.UNRST"], dic["equil_cache"], "equil")
+    if not from_cache(dic, ["EQUIL.UNRST"], dic["equil_cache"]):
+        shutil.copyfile(
+            f"{dic['exe']}/{dic['fol']}/equil/EQUIL.UNRST",
+            f"{dic['exe']}/{dic['fol']}/deck/EQUIL.UNRST",
+        )
+
+
+def resume(dic, deck, folder):
+    """
+    Continue an interrupted simulation from the last complete report step in its
+    restart file, running a restart deck (RESUME.DATA) and stitching its output
+    files to the previous ones, or run the whole simulation if there is nothing to
+    continue from
+
+    Args:
+        dic (dict): Global dictionary\n
+        deck (str): Name of the input deck\n
+        folder (str): Name of destination of the output files
+
+    Returns:
+        None
+
+    """
+    path = f"{dic['exe']}/{dic['fol']}"
+    steps = []
+    if os.path.isfile(f"{path}/{folder}/{deck}.UNRST"):
+        steps = report_steps(f"{path}/{folder}/{deck}.UNRST", True)
+    if not steps or steps[-1][0] == 0:
+        simulations(dic, deck, folder)
+        return
+    with open(f"{path}/deck/dt.txt", "r", encoding="utf8") as file:
+        lines = file.read().splitlines()
+    if steps[-1][0] >= int(lines[1]) + len(lines[2].split()) - 1:
+        print(f"The simulation in {path}/{folder} already finished")
+        return
+    print(f"Resuming the simulation from the report step {steps[-1][0]}")
+    os.replace(f"{path}/{folder}/{deck}.UNRST", f"{path}/deck/RESUME.UNRST")
+    restart_deck(
+        f"{path}/deck/{deck}.DATA", f"{path}/deck/RESUME.DATA", "RESUME", steps[-1][0]
     )
+    with monitor(dic, "RESUME", folder):
+        run_flow(dic, "RESUME", folder)
+    if os.path.isfile(f"{path}/{folder}/RESUME.UNRST"):
+        stitch_restarts(
+            f"{path}/deck/RESUME.UNRST",
+            f"{path}/{folder}/RESUME.UNRST",
+            f"{path}/{folder}/{deck}.UNRST",
+        )
+        os.remove(f"{path}/deck/RESUME.UNRST")
+    else:
+        os.replace(f"{path}/deck/RESUME.UNRST", f"{path}/{folder}/{deck}.UNRST")
+    names = os.listdir(f"{path}/{folder}")
+    stitched = ["UNRST"]
+    if {f"{deck}.SMSPEC", f"{deck}.UNSMRY", "RESUME.SMSPEC", "RESUME.UNSMRY"} <= set(
+        names
+    ):
+        stitch_summaries(
+            f"{path}/{folder}/{deck}",
+            f"{path}/{folder}/RESUME",
+            f"{path}/{folder}/{deck}",
+        )
+        stitched += ["SMSPEC", "UNSMRY"]
+    if {f"{deck}.INFOSTEP", "RESUME.INFOSTEP"} <= set(names):
+        stitch_infosteps(
+            f"{path}/{folder}/{deck}.INFOSTEP",
+            f"{path}/{folder}/RESUME.INFOSTEP",
+            f"{path}/{folder}/{deck}.INFOSTEP",
+        )
+        stitched.append("INFOSTEP")
+    for name in names:
+        if name.startswith("RESUME."):
+            if name[7:] in stitched:
+                os.remove(f"{path}/{folder}/{name}")
+            else:
+                os.replace(
+                    f"{path}/{folder}/{name}", f"{path}/{folder}/{deck}.{name[7:]}"
+                )
 
 
 def plotting(dic):
@@ -48,9 +243,11 @@ def plotting(dic):
         "-r " + f"{dic['resolution']}",
     ]
     print(" ".join(plot_exe))
-    prosc = subprocess.run(plot_exe, check=True)
+    prosc = subprocess.run(profiled(dic, plot_exe, "plotting"), check=True)
     if prosc.returncode != 0:
         raise ValueError(f"Invalid result: { prosc.returncode }")
+    if dic["profile"]:
+        write_collapsed(f"{dic['profile']}/plotting_script.pstats")
 
 
 def data(dic):
@@ -65,7 +262,68 @@ def data(dic):
 
     """
     os.chdir(f"{dic['exe']}")
-    data_exe = [
+    data_exe = data_args(dic)
+    print(" ".join(data_exe))
+    prosc = subprocess.run(profiled(dic, data_exe, "data"), check=True)
+    if prosc.returncode != 0:
+        raise ValueError(f"Invalid result: { prosc.returncode }")
+    if dic["profile"]:
+        write_collapsed(f"{dic['profile']}/data_script.pstats")
+
+
+def follow(dic, deck, folder):
+    """
+    Run OPM Flow and write the benchmark data of the finished report steps while
+    Flow is running
+
+    Args:
+        dic (dict): Global dictionary\n
+        deck (str): Name of the input deck\n
+        folder (str): Name of destination of the output files
+
+    Returns:
+        None
+
+    """
+    if dic["resume"] or os.path.isfile(f"{dic['exe']}/{dic['fol']}/deck/EQUIL.DATA"):
+        print("The data are written after the simulations restarting from a UNRST file")
+        if dic["resume"]:
+            resume(dic, deck, folder)
+        else:
+            simulations(dic, deck, folder)
+        data(dic)
+        return
+    os.chdir(f"{dic['exe']}")
+    data_exe = data_args(dic) + ["-f " + f"{dic['follow']}"]
+    print(" ".join(data_exe))
+    begin = time.perf_counter()
+    with monitor(dic, deck, folder), subprocess.Popen(
+        f"{dic['flow']} --output-dir={dic['exe']}/{dic['fol']}/{folder} "
+        f"{dic['exe']}/{dic['fol']}/deck/{deck}.DATA",
+        shell=True,
+    ) as flow:
+        with subprocess.Popen(profiled(dic, data_exe, "data")) as prosc:
+            if flow_usage(dic, flow, deck, folder, begin) != 0:
+                prosc.terminate()
+                raise ValueError(f"Invalid result: { flow.returncode }")
+    if prosc.returncode != 0:
+        raise ValueError(f"Invalid result: { prosc.returncode }")
+    if dic["profile"]:
+        write_collapsed(f"{dic['profile']}/data_script.pstats")
+
+
+def data_args(dic):
+    """
+    Arguments for the script to write the benchmark data
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        data_exe (list): Python executable, script, and arguments
+
+    """
+    return [
         "python3",
         f"{dic['pat']}/visualization/data.py",
         "-p " + f"{dic['fol']}",
@@ -76,7 +334,26 @@ def data(dic):
         "-w " + f"{dic['dt_data']}",
         "-u " + f"{dic['use']}",
     ]
-    print(" ".join(data_exe))
-    prosc = subprocess.run(data_exe, check=True)
-    if prosc.returncode != 0:
-        raise ValueError(f"Invalid result: { prosc.returncode }")
+
+
+def profiled(dic, exe, name):
+    """
+    Run a python script with cProfile if the profiling is enabled
+
+    Args:
+        dic (dict): Global dictionary\n
+        exe (list): Python executable, script, and arguments\n
+        name (str): Name of the stage running the script
+
+    Returns:
+        exe (list): Python executable, cProfile options, script, and arguments
+
+    """
+    if not dic["profile"]:
+        return exe
+    os.makedirs(dic["profile"], exist_ok=True)
+    return (
+        exe[:1]
+        + ["-m", "cProfile", "-o", f"{dic['profile']}/{name}_script.pstats"]
+        + exe[1:]
+    )
@@ -0,0 +1,248 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+# pylint: disable=R0912
+
+"""
+Utiliy functions to run the workflow for several configuration files concurrently.
+"""
+
+import os
+import csv
+import json
+import glob
+import time
+import subprocess
+
+STAGES = ["deck", "flow", "data", "plot"]
+
+
+def sweep(dic, files):
+    """
+    Run the stages (deck, flow, data, and plot) of each configuration file as
+    pyopmspe11 processes, starting the ready ones while the sum of their cores
+    is within the budget. The flow stage takes the cores of the mpirun command
+    in the configuration file (also the deck stage with -a, running the trials
+    one at a time), and a failed stage skips the next ones
+
+    Args:
+        dic (dict): Global dictionary\n
+        files (list): Names (or glob patterns) of the configuration files
+
+    Returns:
+        dic (dict): Modified global dictionary
+
+    """
+    configs = []
+    for name in files:
+        configs += sorted(glob.glob(name)) or [name]
+    stages = [stage for stage in STAGES if dic["mode"] == "all" or stage in dic["mode"]]
+    dic["sweep"] = []
+    os.makedirs(f"{dic['exe']}/{dic['fol']}", exist_ok=True)
+    for i, config in enumerate(configs):
+        name = os.path.splitext(os.path.basename(config))[0]
+        if name in [job["config"] for job in dic["sweep"]]:
+            name += f"_{i}"
+        os.makedirs(f"{dic['exe']}/{dic['fol']}/{name}", exist_ok=True)
+        for stage in stages:
+            dic["sweep"].append(
+                {
+                    "config": name,
+                    "file": os.path.abspath(config),
+                    "stage": stage,
+                    "cores": {
+                        "deck": (
+                            max(dic["jobs"], flow_cores(config))
+                            if dic["autotune"]
+                            else dic["jobs"]
+                        ),
+                        "flow": flow_cores(config),
+                    }.get(stage, 1),
+                    "status": "pending",
+                    "start": 0.0,
+                    "wall": 0.0,
+                }
+            )
+    running = {}
+    begin = time.time()
+    printed = begin
+    while any(job["status"] in ["pending", "running"] for job in dic["sweep"]):
+        for i, job in enumerate(dic["sweep"]):
+            if i in running and running[i].poll() is not None:
+                job["wall"] = time.time() - begin - job["start"]
+                job["status"] = (
+                    "done"
+                    if running[i].returncode == 0
+                    else f"failed ({running[i].returncode})"
+                )
+                running.pop(i)
+                print_status(dic)
+        for i, job in enumerate(dic["sweep"]):
+            if job["status"] != "pending":
+                continue
+            if job["stage"] != stages[0]:
+                before = dic["sweep"][i - 1]["status"]
+                if before in ["pending", "running"]:
+                    continue
+                if before != "done":
+                    job["status"] = "skipped"
+                    continue
+            used = sum(dic["sweep"][j]["cores"] for j in running)
+            if running and used + job["cores"] > dic["cores"]:
+                continue
+            running[i] = launch(dic, job)
+            job["start"] = time.time() - begin
+            job["status"] = "running"
+        if dic["monitor"] and time.time() - printed > dic["monitor"]:
+            print_status(dic)
+            printed = time.time()
+        time.sleep(0.1)
+    write_status(dic)
+
+
+def flow_cores(config):
+    """
+    Number of MPI processes requested for Flow in a configuration file
+
+    Args:
+        config (str): Name of the configuration file
+
+    Returns:
+        cores (int): Value after -np (or -n) in the flow command, otherwise 1
+
+    """
+    with open(config, "r", encoding="utf8") as file:
+        values = file.read().splitlines()[1].split()
+    for i, value in enumerate(values[:-1]):
+        if value in ["-np", "-n", "--np", "--n"] and values[i + 1].isdigit():
+            return int(values[i + 1])
+    return 1
+
+
+def launch(dic, job):
+    """
+    Start the pyopmspe11 process of one stage, writing its output in a log file
+
+    Args:
+        dic (dict): Global dictionary\n
+        job (dict): Configuration file, stage, and status of the job
+
+    Returns:
+        process (Popen): Process running the stage
+
+    """
+    folder = f"{dic['exe']}/{dic['fol']}"
+    config = job["file"]
+    tuned = (
+        f"{folder}/{job['config']}/"
+        f"{os.path.splitext(os.path.basename(config))[0]}_tuned.txt"
+    )
+    if dic["autotune"] and job["stage"] != "deck" and os.path.isfile(tuned):
+        # The next stages use the flags chosen by the trials in the deck stage
+        config = tuned
+    args = [
+        "pyopmspe11",
+        "-i",
+        config,
+        "-o",
+        job["config"],
+        "-m",
+        job["stage"],
+        "-g",
+        dic["generate"],
+        "-r",
+        dic["resolution"],
+        "-t",
+        dic["time_data"],
+        "-w",
+        f"{dic['dt_data']}",
+        "-u",
+        dic["use"],
+        "-b",
+        f"{dic['binary']}",
+        "-x",
+        f"{dic['text']}",
+        "-j",
+        f"{dic['jobs']}",
+        "-p",
+        f"{1 if dic['profile'] else 0}",
+        "-e",
+        f"{dic['equilibration']}",
+        "-s",
+        f"{dic['resume']}",
+        "-l",
+        f"{dic['monitor']}",
+        "-a",
+        f"{dic['autotune']}",
+        "-n",
+        f"{job['cores']}",
+    ]
+    with open(
+        f"{folder}/{job['config']}/{job['stage']}.log", "w", encoding="utf8"
+    ) as log:
+        return subprocess.Popen(  # pylint: disable=R1732
+            args, cwd=folder, stdout=log, stderr=subprocess.STDOUT
+        )
+
+
+def print_status(dic):
+    """
+    Write the status of the stages to the terminal, with the progress and projected
+    completion time of the running simulations if they are monitored
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        None
+
+    """
+    done = sum(job["status"] not in ["pending", "running"] for job in dic["sweep"])
+    print(f"\nSweep: {done}/{len(dic['sweep'])} stages finished")
+    width = max([len("config")] + [len(job["config"]) for job in dic["sweep"]]) + 2
+    print(
+        f"{'config':<{width}}{'stage':<7}{'cores':>6} {'status':<12}{'wall [s]':>10}"
+        f"{'progress':>10}  eta"
+    )
+    for job in dic["sweep"]:
+        progress = ["", ""]
+        fname = f"{dic['exe']}/{dic['fol']}/{job['config']}/status.json"
+        if (
+            job["stage"] == "flow"
+            and job["status"] != "pending"
+            and os.path.isfile(fname)
+        ):
+            # Written by the simulations with -l (see pyopmspe11.utils.monitor)
+            with open(fname, "r", encoding="utf8") as file:
+                status = json.load(file)
+            progress[0] = f"{status['progress [%]']:.1f}%"
+            if status["state"] == "running" and status["eta"]:
+                progress[1] = status["eta"]
+        print(
+            f"{job['config']:<{width}}{job['stage']:<7}{job['cores']:>6} "
+            f"{job['status']:<12}{job['wall']:>10.1f}{progress[0]:>10}  {progress[1]}"
+        )
+
+
+def write_status(dic):
+    """
+    Write the status, start, and wall time of the stages in sweep.csv
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        None
+
+    """
+    print_status(dic)
+    names = ["config", "stage", "cores", "status", "start", "wall"]
+    with open(
+        f"{dic['exe']}/{dic['fol']}/sweep.csv", "w", encoding="utf8", newline=""
+    ) as file:
+        writer = csv.writer(file)
+        writer.writerow(names[:4] + ["start [s]", "wall [s]"])
+        for job in dic["sweep"]:
+            writer.writerow(
+                [job[name] for name in names[:4]]
+                + [f"{job['start']:.3f}", f"{job['wall']:.3f}"]
+            )
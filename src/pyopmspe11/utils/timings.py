@@ -0,0 +1,154 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""
+Utiliy functions to record the wall time, CPU time, and peak memory of the stages.
+"""
+
+import os
+import json
+import time
+import cProfile
+import pstats
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None  # type: ignore
+
+
+@contextmanager
+def timer(dic, name):
+    """
+    Record the wall time, CPU time (own and of the finished child processes, e.g.,
+    Flow), and peak resident memory of a stage. Stages inside another one are named
+    after both (e.g., 'opm_files/grid'), and repeated stages add up their values.
+    If a profile folder is given in dic["profile"], then the outer stages are also
+    profiled with cProfile
+
+    Args:
+        dic (dict): Global dictionary\n
+        name (str): Name of the stage
+
+    Returns:
+        dic (dict): Modified global dictionary
+
+    """
+    dic.setdefault("timings", [])
+    dic.setdefault("stages", []).append(name)
+    stage = "/".join(dic["stages"])
+    record = next((rec for rec in dic["timings"] if rec["stage"] == stage), None)
+    if record is None:
+        record = {"stage": stage, "calls": 0, "wall": 0.0, "cpu": 0.0}
+        record.update({"cpu_children": 0.0, "maxrss": None, "maxrss_children": None})
+        dic["timings"].append(record)
+    profiler = None
+    if dic.get("profile") and len(dic["stages"]) == 1:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    wall, cpu, cpu_children = time.perf_counter(), time.process_time(), children()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(dic["profile"], exist_ok=True)
+            profiler.dump_stats(f"{dic['profile']}/{stage}.pstats")
+            write_collapsed(f"{dic['profile']}/{stage}.pstats")
+        record["calls"] += 1
+        record["wall"] += time.perf_counter() - wall
+        record["cpu"] += time.process_time() - cpu
+        record["cpu_children"] += children() - cpu_children
+        if resource is not None:
+            # ru_maxrss is in KB on Linux, then converted to MB
+            record["maxrss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+            record["maxrss_children"] = (
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1e3
+            )
+        dic["stages"].pop()
+
+
+def children():
+    """
+    CPU time (user and system) of the finished child processes
+
+    Returns:
+        cpu (float): Time in seconds
+
+    """
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def write_timings(dic, fname, extra=None):
+    """
+    Write the recorded stages in a json file, adding the stages recorded by another
+    pyopmspe11 script (e.g., the data postprocessing) as sub-stages
+
+    Args:
+        dic (dict): Global dictionary\n
+        fname (str): Name of the json file\n
+        extra (dict): Names of the stages and json files written by other scripts
+
+    Returns:
+        None
+
+    """
+    timings = [dict(record) for record in dic.get("timings", [])]
+    for stage, other in (extra or {}).items():
+        if os.path.isfile(other):
+            with open(other, "r", encoding="utf8") as file:
+                for record in json.load(file)["stages"]:
+                    record["stage"] = f"{stage}/{record['stage']}"
+                    timings.append(record)
+    summary = {name: dic[name] for name in ["spe11", "grid", "noCells"] if name in dic}
+    if "noCells" in summary:
+        summary["noCells"] = [int(num) for num in summary["noCells"]]
+    with open(fname, "w", encoding="utf8") as file:
+        json.dump({**summary, "stages": timings}, file, indent=1)
+
+
+def write_collapsed(fname, minimum=1):
+    """
+    Write the collapsed stacks of a cProfile dump (one line per call path with its
+    own time in microseconds, e.g., for flamegraph.pl or speedscope). The cProfile
+    dumps only keep the caller-callee pairs, then the time of a function is split
+    among its callers in proportion to the cumulative time of each call
+
+    Args:
+        fname (str): Name of the .pstats file\n
+        minimum (int): Call paths with less own and cumulative time (in
+            microseconds) are dropped
+
+    Returns:
+        None
+
+    """
+    stats = pstats.Stats(fname).stats  # type: ignore
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    lines = {}
+    paths = [
+        ((func,), 1.0) for func, values in stats.items() if not values[4] and values[3]
+    ]
+    while paths:
+        path, share = paths.pop()
+        name = ";".join(
+            f"{func[2]} ({os.path.basename(func[0])}:{func[1]})".replace(";", ",")
+            for func in path
+        )
+        lines[name] = lines.get(name, 0.0) + stats[path[-1]][2] * share * 1e6
+        for func, cumtime in callees.get(path[-1], []):
+            if func not in path and cumtime * share * 1e6 >= minimum:
+                paths.append((path + (func,), cumtime * share / stats[func][3]))
+    with open(f"{os.path.splitext(fname)[0]}.collapsed", "w", encoding="utf8") as file:
+        file.write(
+            "".join(
+                f"{name} {round(value)}\n"
+                for name, value in sorted(lines.items())
+                if round(value) >= minimum
+            )
+        )
@@ -6,37 +6,72 @@ Utiliy functions to write necessary files and variables
 """
 
 import os
-import subprocess
+import math
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+import numpy as np
 from mako.template import Template
+from scipy import special
+from pyopmspe11.utils.geometry import (
+    corner_depths,
+    from_cache,
+    grid_keywords,
+    grid_nodes,
+    to_cache,
+)
+from pyopmspe11.utils.timings import timer
 
+VECTOR = {
+    "np": np,
+    "math": SimpleNamespace(
+        **{
+            **vars(math),
+            **{name: getattr(special, name) for name in ["erf", "erfc", "gamma"]},
+            **{
+                name: getattr(np, name)
+                for name in ["exp", "log", "log10", "sqrt", "sin", "cos", "tan", "tanh"]
+            },
+        }
+    ),
+    "max": np.maximum,
+    "min": np.minimum,
+    "abs": np.abs,
+}  # Element-wise functions to evaluate the saturation functions
 
-def initial(dic):
+
+def write_decks(dic, no_inj):
     """
-    Write the initial deck to generate output files used for e.g., find cell coordinates
+    Write the deck, and the deck of the no-injection period (EQUIL.DATA) if the
+    simulation restarts from it
 
     Args:
-        dic (dict): Global dictionary
+        dic (dict): Global dictionary\n
+        no_inj (int): Number of periods before the injection starts
 
     Returns:
         None
 
     """
+    mytemplate = Template(filename=f"{dic['pat']}/templates/co2/{dic['spe11']}.mako")
     var = {"dic": dic}
-    mytemplate = Template(filename=f"{dic['pat']}/templates/common/grid_initial.mako")
     filledtemplate = mytemplate.render(**var)
     with open(
-        f"{dic['exe']}/{dic['fol']}/deck/GRID.INC",
+        f"{dic['exe']}/{dic['fol']}/deck/{dic['fol'].upper()}.DATA",
         "w",
         encoding="utf8",
     ) as file:
         file.write(filledtemplate)
-    mytemplate = Template(filename=f"{dic['pat']}/templates/common/deck_initial.mako")
-    var = {"dic": dic}
-    filledtemplate = mytemplate.render(**var)
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/INITIAL.DATA", "w", encoding="utf8"
-    ) as file:
-        file.write(filledtemplate)
+    for name in ["EQUIL.DATA", "EQUIL.UNRST"]:
+        if os.path.isfile(f"{dic['exe']}/{dic['fol']}/deck/{name}"):
+            os.remove(f"{dic['exe']}/{dic['fol']}/deck/{name}")
+    if dic["restart"]:
+        var = {"dic": {**dic, "inj": dic["inj"][:no_inj], "restart": 0}}
+        with open(
+            f"{dic['exe']}/{dic['fol']}/deck/EQUIL.DATA", "w", encoding="utf8"
+        ) as file:
+            file.write(f"-- No-injection period for Flow {dic['flow_version']}\n")
+            file.write(mytemplate.render(**var))
 
 
 def write_keywords(dic):
@@ -47,51 +82,209 @@ def write_keywords(dic):
         dic (dict): Global dictionary
 
     Returns:
-        dic (dict): Modified global dictionary
+        files (list): Names of the written files in the deck folder
 
     """
     git = "-- This deck was generated by pyopmspe11 https://github.com/OPM/pyopmspe11"
     if dic["spe11"] == "spe11a":
         if dic["grid"] == "tensor":
             keywords = ["satnum", "fipnum", "poro", "permx", "dx", "dz"]
-            dic["dx"] = list(map(str, list((dic["xmx"][1:] - dic["xmx"][:-1]))))
-            d_z = list(map(str, list((dic["zmz"][1:] - dic["zmz"][:-1]))))
-            dic["dz"] = [d_z[0]] * dic["noCells"][0]
-            for i in range(dic["noCells"][2] - 1):
-                dic["dx"].extend(dic["dx"][-dic["noCells"][0] :])
-                dic["dz"] += [d_z[i + 1]] * dic["noCells"][0]
+            dic["dx"] = np.tile(dic["xmx"][1:] - dic["xmx"][:-1], dic["noCells"][2])
+            dic["dz"] = np.repeat(dic["zmz"][1:] - dic["zmz"][:-1], dic["noCells"][0])
         else:
             keywords = ["satnum", "fipnum", "poro", "permx"]
     elif dic["spe11"] == "spe11b":
-        dic["dx"] = list(map(str, list((dic["xmx"][1:] - dic["xmx"][:-1]))))
+        dic["dx"] = np.tile(dic["xmx"][1:] - dic["xmx"][:-1], dic["noCells"][2])
         if dic["grid"] == "tensor":
             keywords = ["satnum", "fipnum", "poro", "permx", "thconr", "dx", "dz"]
-            d_z = list(map(str, list((dic["zmz"][1:] - dic["zmz"][:-1]))))
-            dic["dz"] = [d_z[0]] * dic["noCells"][0]
-            for i in range(dic["noCells"][2] - 1):
-                dic["dx"].extend(dic["dx"][-dic["noCells"][0] :])
-                dic["dz"] += [d_z[i + 1]] * dic["noCells"][0]
+            dic["dz"] = np.repeat(dic["zmz"][1:] - dic["zmz"][:-1], dic["noCells"][0])
         else:
             keywords = ["satnum", "fipnum", "poro", "permx", "thconr", "dx"]
-            for _ in range(dic["noCells"][2] - 1):
-                dic["dx"].extend(dic["dx"][-dic["noCells"][0] :])
         added_pv(dic, git)
     else:
         keywords = ["satnum", "fipnum", "poro", "permx", "thconr"]
         added_pv(dic, git)
     if sum(dic["dispersion"]) > 0:
         keywords += ["disperc"]
+    files = [] if dic["spe11"] == "spe11a" else ["PVBOUNDARIES.INC"]
     for names in keywords:
-        dic[f"{names}"].insert(0, f"{names.upper()}")
-        dic[f"{names}"].insert(0, git)
-        dic[f"{names}"].insert(0, "-- Copyright (C) 2023 NORCE")
-        dic[f"{names}"].append("/")
+        files.append(f"{names.upper()}.{'IMPORT' if dic['binary'] else 'INC'}")
+        if dic["binary"]:
+            write_binary(
+                f"{dic['exe']}/{dic['fol']}/deck/{files[-1]}",
+                {names.upper(): dic[f"{names}"]},
+            )
+            continue
         with open(
             f"{dic['exe']}/{dic['fol']}/deck/{names.upper()}.INC",
             "w",
             encoding="utf8",
         ) as file:
-            file.write("\n".join(dic[f"{names}"]))
+            file.write(f"-- Copyright (C) 2023 NORCE\n{git}\n{names.upper()}\n")
+            write_values(file, dic[f"{names}"])
+            file.write("\n/")
+    return files
+
+
+def write_values(file, values, chunk=1048576):
+    """
+    Write the values using the OPM repeat count (n*value), one run per line, and
+    formatting only once each of the distinct values
+
+    Args:
+        file (file): Opened text file\n
+        values (array): Integers or floats with the cell values\n
+        chunk (int): Number of runs joined at once to bound the memory use
+
+    Returns:
+        None
+
+    """
+    values = np.asarray(values)
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    counts = np.diff(np.append(starts, len(values)))
+    uniques, inverse = np.unique(values[starts], return_inverse=True)
+    strings = np.array([str(value) for value in uniques.tolist()], dtype=object)
+    for i in range(0, len(starts), chunk):
+        if i > 0:
+            file.write("\n")
+        file.write(
+            "\n".join(
+                string if count == 1 else f"{count}*{string}"
+                for count, string in zip(
+                    counts[i : i + chunk].tolist(), strings[inverse[i : i + chunk]]
+                )
+            )
+        )
+
+
+def write_binary(fname, keywords):
+    """
+    Write the arrays in the Eclipse unformatted (big-endian) format read by IMPORT
+
+    Args:
+        fname (str): Name of the binary file\n
+        keywords (dict): Keyword names and their arrays of values
+
+    Returns:
+        None
+
+    """
+    with open(fname, "wb") as file:
+        for name, values in keywords.items():
+            values = np.ravel(values)
+            if np.issubdtype(values.dtype, np.integer):
+                kind, values = "INTE", values.astype(">i4")
+            else:
+                kind, values = "DOUB", values.astype(">f8")
+            file.write(
+                fortran_record(
+                    f"{name:<8}".encode()
+                    + np.array([len(values)], dtype=">i4").tobytes()
+                    + kind.encode()
+                )
+            )
+            for i in range(0, len(values), 1000):
+                file.write(fortran_record(values[i : i + 1000].tobytes()))
+
+
+def fortran_record(data):
+    """
+    Add the leading and trailing byte counts of a Fortran unformatted record
+
+    Args:
+        data (bytes): Content of the record
+
+    Returns:
+        record (bytes): Content of the record with the byte counts
+
+    """
+    count = np.array([len(data)], dtype=">i4").tobytes()
+    return count + data + count
+
+
+def write_grid(dic, chunk=8):
+    """
+    Write the COORD and ZCORN of the spe11c grids in GRID.INC, splitting the layers
+    of the ZCORN values among the given number of processes (jobs), each one writing
+    a temporary file that is then appended in order
+
+    Args:
+        dic (dict): Global dictionary\n
+        chunk (int): Number of cell layers joined at once to bound the memory use
+
+    Returns:
+        None
+
+    """
+    coord, nodes = grid_nodes(dic)
+    x_s = [str(value) for value in coord[0, :, 0].tolist()]
+    y_s = [str(value) for value in coord[:, 0, 1].tolist()]
+    fname = f"{dic['exe']}/{dic['fol']}/deck/GRID.INC"
+    with open(fname, "w", encoding="utf8") as file:
+        file.write(
+            "-- Copyright (C) 2023 NORCE\n-- This file was generated by pyopmspe11 "
+            + "https://github.com/OPM/pyopmspe11\nCOORD\n"
+        )
+        for y_v in y_s:
+            file.write("".join(f"{x_v} {y_v} 0.0 {x_v} {y_v} 0.0\n" for x_v in x_s))
+        file.write("/\n\nZCORN\n")
+    top = 2 * dic["noCells"][0] * dic["noCells"][1]
+    layers = [
+        ks
+        for ks in np.array_split(np.arange(dic["noCells"][2]), dic["jobs"])
+        if ks.size
+    ]
+    if len(layers) > 1:
+        with ProcessPoolExecutor(max_workers=len(layers)) as executor:
+            for future in [
+                executor.submit(
+                    write_zcorn,
+                    f"{fname}.{n}",
+                    nodes[ks[0] : ks[-1] + 2],
+                    top if ks[0] == 0 else 0,
+                    chunk,
+                )
+                for n, ks in enumerate(layers)
+            ]:
+                future.result()
+        with open(fname, "ab") as file:
+            for n, _ in enumerate(layers):
+                with open(f"{fname}.{n}", "rb") as part:
+                    shutil.copyfileobj(part, file)
+                os.remove(f"{fname}.{n}")
+    else:
+        write_zcorn(fname, nodes, top, chunk)
+    with open(fname, "a", encoding="utf8") as file:
+        file.write("/")
+
+
+def write_zcorn(fname, nodes, top, chunk):
+    """
+    Append the ZCORN values of the given layers of grid nodes to a text file,
+    formatting only once the depth of each node and streaming the cell corners
+
+    Args:
+        fname (str): Name of the text file\n
+        nodes (array): Floats with the depths of the grid nodes of the layers\n
+        top (int): Number of the first values written without the leading space\n
+        chunk (int): Number of cell layers joined at once to bound the memory use
+
+    Returns:
+        None
+
+    """
+    nodes = np.reshape(
+        np.array([str(value) for value in nodes.ravel().tolist()], dtype=object),
+        nodes.shape,
+    )
+    with open(fname, "a", encoding="utf8") as file:
+        for k in range(0, nodes.shape[0] - 1, chunk):
+            zcorn = corner_depths(nodes[k : k + chunk + 1]).reshape(-1, 2).tolist()
+            if k == 0 and top:
+                file.write("".join(f"{z_l} {z_r}\n" for z_l, z_r in zcorn[:top]))
+                zcorn = zcorn[top:]
+            file.write("".join(f" {z_l} {z_r}\n" for z_l, z_r in zcorn))
 
 
 def added_pv(dic, git):
@@ -118,73 +311,162 @@ def added_pv(dic, git):
         file.write("\n".join(dic["porv"]))
 
 
-def opm_files(dic):
+def grid_files(dic):
     """
-    Write opm-related files by running mako templates
+    Write the pillars and corner depths of the spe11c and corner-point grids
 
     Args:
         dic (dict): Global dictionary
 
     Returns:
-        None
+        files (list): Names of the written files in the deck folder
 
     """
-    write_keywords(dic)
-    mytemplate = Template(filename=f"{dic['pat']}/templates/co2/{dic['spe11']}.mako")
-    var = {"dic": dic}
-    filledtemplate = mytemplate.render(**var)
-    with open(
-        f"{dic['exe']}/{dic['fol']}/deck/{dic['fol'].upper()}.DATA",
-        "w",
-        encoding="utf8",
-    ) as file:
-        file.write(filledtemplate)
+    if dic["binary"] and (dic["spe11"] == "spe11c" or dic["grid"] == "corner-point"):
+        write_binary(f"{dic['exe']}/{dic['fol']}/deck/GRID.IMPORT", grid_keywords(dic))
+        return ["GRID.IMPORT"]
     if dic["spe11"] == "spe11c":
-        if dic["grid"] == "corner-point":
-            mytemplate = Template(
-                filename=f"{dic['pat']}/templates/common/grid_corner.mako"
-            )
-        else:
-            mytemplate = Template(
-                filename=f"{dic['pat']}/templates/common/grid_tensor.mako"
-            )
-        filledtemplate = mytemplate.render(**var)
+        write_grid(dic)
+        return ["GRID.INC"]
+    if dic["grid"] == "corner-point":
+        mytemplate = Template(
+            filename=f"{dic['pat']}/templates/common/grid_initial.mako"
+        )
+        filledtemplate = mytemplate.render(**{"dic": dic})
         with open(
             f"{dic['exe']}/{dic['fol']}/deck/GRID.INC",
             "w",
             encoding="utf8",
         ) as file:
             file.write(filledtemplate)
-    mytemplate = Template(
-        filename=f"{dic['pat']}/templates/common/saturation_functions.mako"
-    )
-    filledtemplate = mytemplate.render(**var)
+        return ["GRID.INC"]
+    return []
+
+
+def write_tables(dic):
+    """
+    Write the saturation functions in TABLES.INC, evaluating the expressions in the
+    configuration file once over all the saturation points of each facie
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        files (list): Names of the written files in the deck folder
+
+    """
+    code = {
+        name: compile(dic[name].strip(), name, "eval")
+        for name in ["s_w", "krw", "krn", "pcap"]
+    }
+    lines = [
+        "-- Copyright (C) 2023 NORCE",
+        "-- This file was generated by pyopmspe11 https://github.com/OPM/pyopmspe11",
+        "SGWFN" if dic["co2store"] == "gaswater" else "SGOF",
+    ]
+    for swi, sni, pen, penmax, npoints in dic["safu"]:
+        s_n = 1.0 - np.asarray(
+            evaluate(code["s_w"], {"npoints": npoints}, vector=False), dtype=float
+        )
+        s_w = 1.0 - s_n
+        krn = evaluate(code["krn"], {"s_w": s_w, "sni": sni})
+        krw = evaluate(code["krw"], {"s_w": s_w, "swi": swi})
+        pcap = np.full(len(s_w), penmax)
+        ind = s_w > swi
+        pcap[ind] = evaluate(
+            code["pcap"], {"s_w": s_w[ind], "swi": swi, "pen": pen, "penmax": penmax}
+        )
+        lines += [
+            f"{val_n:E} {val_krn:E} {val_krw:E} {val_pcap / 1.0e5:E} "
+            for val_n, val_krn, val_krw, val_pcap in zip(s_n, krn, krw, pcap)
+        ]
+        lines.append("/")
     with open(
-        f"{dic['exe']}/{dic['fol']}/deck/saturation_functions.py",
+        f"{dic['exe']}/{dic['fol']}/deck/TABLES.INC",
         "w",
         encoding="utf8",
     ) as file:
-        file.write(filledtemplate)
-    os.system(f"chmod u+x {dic['exe']}/{dic['fol']}/deck/saturation_functions.py")
-    prosc = subprocess.run(
-        ["python3", f"{dic['exe']}/{dic['fol']}/deck/saturation_functions.py"],
-        check=True,
+        file.write("\n".join(lines) + "\n")
+    return ["TABLES.INC"]
+
+
+def evaluate(code, values, vector=True):
+    """
+    Evaluate a compiled expression from the configuration file, with the scalar
+    functions (max, min, abs, math) replaced by their element-wise numpy/scipy
+    versions, or point by point if the expression only supports scalars
+
+    Args:
+        code (code): Compiled expression\n
+        values (dict): Values of the variables in the expression\n
+        vector (bool): Replace the scalar functions by the element-wise ones
+
+    Returns:
+        result (array): Values of the expression
+
+    """
+    if vector:
+        try:
+            with np.errstate(all="ignore"):
+                result = eval(code, {**VECTOR, **values})  # pylint: disable=W0123
+            return np.broadcast_to(result, np.shape(values["s_w"]))
+        except (TypeError, ValueError):
+            pass
+    if "s_w" not in values:
+        return eval(code, {"np": np, "math": math, **values})  # pylint: disable=W0123
+    return np.array(
+        [
+            eval(  # pylint: disable=W0123
+                code, {"np": np, "math": math, **values, "s_w": s_w}
+            )
+            for s_w in values["s_w"]
+        ],
+        dtype=float,
     )
-    if prosc.returncode != 0:
-        raise ValueError(f"Invalid result: { prosc.returncode }")
-    os.system(f"rm -rf {dic['exe']}/{dic['fol']}/deck/saturation_functions.py")
+
+
+def opm_files(dic):
+    """
+    Write opm-related files by running mako templates
+
+    Args:
+        dic (dict): Global dictionary
+
+    Returns:
+        None
+
+    """
+    with timer(dic, "properties"):
+        files = write_keywords(dic)
     inj_t = 0.0
     skip_unrst = 0
     ini_count = 0
+    no_inj = 0
     times = ["0."]
     for inj in dic["inj"]:
         if inj[4] + inj[7] == 0.0 and ini_count == 0:
             inj_t += inj[0]
             skip_unrst += int(inj[0] / inj[1])
+            no_inj += 1
         else:
             ini_count = 1
             for _ in range(int(inj[0] / inj[1])):
                 times.append(f"{inj[1] + float(times[-1])}")
+    # The no-injection period is simulated in EQUIL.DATA to restart from it
+    dic["restart"] = (
+        skip_unrst if dic["equilibration"] and no_inj < len(dic["inj"]) else 0
+    )
+    write_decks(dic, no_inj)
+    with timer(dic, "grid"):
+        if dic["grid"] != "corner-point":
+            files += grid_files(dic)
+        else:
+            files.append("GRID.IMPORT" if dic["binary"] else "GRID.INC")
+            if not from_cache(dic, files[-1:]):
+                grid_files(dic)
+                to_cache(dic, files[-1:])
+    with timer(dic, "tables"):
+        files += write_tables(dic)
     with open(
         f"{dic['exe']}/{dic['fol']}/deck/dt.txt",
         "w",
@@ -193,3 +475,8 @@ def opm_files(dic):
         file.write(f"{inj_t}\n")
         file.write(f"{skip_unrst}\n")
         file.write(" ".join(times))
+    # Only the files of this run, not older ones in the same deck folder
+    size = sum(
+        os.path.getsize(f"{dic['exe']}/{dic['fol']}/deck/{name}") for name in files
+    )
+    print(f"Total size of the written *.INC and *.IMPORT files: {size / 1e6:.2f} MB")
@@ -1,6 +1,6 @@
 # SPDX-FileCopyrightText: 2023 NORCE
 # SPDX-License-Identifier: MIT
-# pylint: disable=C0302, R0912, R0914
+# pylint: disable=C0302, R0912, R0914, R0915
 
 """"
 Script to write the benchmark data
@@ -9,12 +9,16 @@ Script to write the benchmark data
 import os
 import argparse
 import csv
+import json
 from io import StringIO
+from time import sleep
+from shapely import polygons
 from shapely.geometry import Polygon
 from rtree import index
 import numpy as np
 import pandas as pd
 from scipy.interpolate import interp1d
+from pyopmspe11.utils.timings import timer, write_timings
 
 try:
     from opm.io.ecl import EclFile as OpmFile
@@ -35,6 +39,29 @@ WAT_DEN_REF = 998.108
 SECONDS_IN_YEAR = 31536000
 KMOL_TO_KG = 1e3 * 0.044
 SGAS_THR = 0.097
+PERFORMANCE_MODES = [
+    "performance",
+    "all",
+    "dense_performance",
+    "performance_sparse",
+    "dense_performance_sparse",
+]
+SPARSE_MODES = [
+    "all",
+    "sparse",
+    "dense_sparse",
+    "dense_performance_sparse",
+    "performance_sparse",
+]
+DENSE_MODES = [
+    "all",
+    "performance-spatial",
+    "dense",
+    "dense_performance",
+    "dense_sparse",
+    "dense_performance-spatial",
+    "dense_performance_sparse",
+]
 
 
 def main():
@@ -86,6 +113,14 @@ def main():
         default="resdata",
         help="Using the 'resdata' or python package (resdata by default).",
     )
+    parser.add_argument(
+        "-f",
+        "--follow",
+        default="0",
+        help="Seconds between the checks for new report steps to write the data while "
+        "Flow is running, until the end of the simulation ('0' by default, i.e., the "
+        "simulation already finished).",
+    )
     cmdargs = vars(parser.parse_known_args()[0])
     dig = {"path": cmdargs["path"].strip()}
     dig["case"] = cmdargs["deck"].strip()
@@ -93,6 +128,7 @@ def main():
     dig["exe"] = os.getcwd()
     dig["where"] = f"{dig['exe']}/{dig['path']}/data"
     dig["use"] = cmdargs["use"].strip()
+    dig["follow"] = float(cmdargs["follow"])
     dig["nxyz"] = np.genfromtxt(
         StringIO(cmdargs["resolution"]), delimiter=",", dtype=int
     )
@@ -117,41 +153,138 @@ def main():
     dig["nocellsr"] = dig["nxyz"][0] * dig["nxyz"][1] * dig["nxyz"][2]
     dig["noxzr"] = dig["nxyz"][0] * dig["nxyz"][2]
     read_times(dig)
-    if dig["use"] == "opm":
-        read_opm(dig)
+    if isinstance(dig["dense_t"], float):
+        dig["dense_t"] = [
+            i * dig["dense_t"]
+            for i in range(int(np.floor((dig["times"][-1]) / dig["dense_t"])) + 1)
+        ]
+    if dig["follow"]:
+        with timer(dig, "follow"):
+            follow(dig)
     else:
-        read_resdata(dig)
-    if dig["mode"] in [
-        "performance",
-        "all",
-        "dense_performance",
-        "performance_sparse",
-        "dense_performance_sparse",
-    ]:
-        performance(dig)
-    if dig["mode"] in [
-        "all",
-        "sparse",
-        "dense_sparse",
-        "dense_performance_sparse",
-        "performance_sparse",
-    ]:
-        sparse_data(dig)
-    if dig["mode"] in [
-        "all",
-        "performance-spatial",
-        "dense",
-        "dense_performance",
-        "dense_sparse",
-        "dense_performance-spatial",
-        "dense_performance_sparse",
-    ]:
-        if isinstance(dig["dense_t"], float):
-            dig["dense_t"] = [
-                i * dig["dense_t"]
-                for i in range(int(np.floor((dig["times"][-1]) / dig["dense_t"])) + 1)
-            ]
-        dense_data(dig)
+        with timer(dig, "read"):
+            read_simulation(dig)
+    if dig["mode"] in PERFORMANCE_MODES:
+        with timer(dig, "performance"):
+            performance(dig)
+    if dig["mode"] in SPARSE_MODES:
+        with timer(dig, "sparse"):
+            sparse_data(dig, dig.get("sparse"))
+    if dig["mode"] in DENSE_MODES:
+        with timer(dig, "dense"):
+            dense_data(dig, dig.get("dense"))
+    write_timings(dig, f"{dig['where']}/timings.json")
+
+
+def follow(dig):
+    """
+    Write the dense data and compute the total variation in Box C for the report
+    steps finished while Flow is running. A report step is finished when the next
+    one is in the restart file, or when the simulation ended
+
+    Args:
+        dig (dict): Global dictionary
+
+    Returns:
+        dig (dict): Modified global dictionary
+
+    """
+    done = 0
+    while True:
+        finished = simulation_finished(dig)
+        if not read_simulation(dig, finished):
+            sleep(dig["follow"])
+            continue
+        if dig["mode"] in SPARSE_MODES and "sparse" not in dig:
+            dig["sparse"] = sparse_setup(dig)
+            dig["sparse"]["xcw_max"] = -1 if has_rssat(dig) else 0
+            dig["sparse"]["xcw_top"] = 0.0
+        if dig["mode"] in DENSE_MODES and "dense" not in dig:
+            with timer(dig, "dense"):
+                dig["dense"] = dense_mapping(dig)
+        for t_n in range(done, dig["norst"] - (0 if finished else 1)):
+            if "sparse" in dig and t_n >= dig["no_skip_rst"]:
+                with timer(dig, "sparse"):
+                    follow_sparse(dig, dig["sparse"], t_n)
+            if "dense" in dig and (dig["mode"] == "all" or dig["mode"][:5] == "dense"):
+                for i, rst in enumerate(dig["dense"]["rstno"]):
+                    if rst + dig["no_skip_rst"] == t_n:
+                        with timer(dig, "dense"):
+                            dense_step(dig, dig["dense"], i)
+            done = t_n + 1
+        if finished:
+            break
+        sleep(dig["follow"])
+    if "sparse" in dig and dig["sparse"]["xcw_top"] > 0:
+        dig["sparse"]["m_c"] = [
+            value / dig["sparse"]["xcw_top"] for value in dig["sparse"]["m_c"]
+        ]
+
+
+def follow_sparse(dig, dil, t_n):
+    """
+    Total variation in Box C for one finished report step. Without RSSAT (or
+    RSWSAT), the normalization by the maximum CO2 mass fraction of the whole
+    simulation is applied after the last report step
+
+    Args:
+        dig (dict): Global dictionary\n
+        dil (dict): Local dictionary\n
+        t_n (int): Index for the number of restart file
+
+    Returns:
+        dil (dict): Modified local dictionary
+
+    """
+    if dil["xcw_max"] == 0:
+        dil["xcw_top"] = max(
+            dil["xcw_top"], np.max(get_xcw(dig, t_n)[dil["boxc"]], initial=0.0)
+        )
+    if t_n > dig["no_skip_rst"]:
+        dil["m_c"].append(total_variation(dig, dil, t_n))
+
+
+def simulation_finished(dig):
+    """
+    Check if Flow wrote the end of the simulation in the PRT file
+
+    Args:
+        dig (dict): Global dictionary
+
+    Returns:
+        finished (bool): True if the simulation ended
+
+    """
+    if not os.path.isfile(f"{dig['sim']}.PRT"):
+        return False
+    with open(f"{dig['sim']}.PRT", "rb") as file:
+        file.seek(max(0, os.path.getsize(f"{dig['sim']}.PRT") - 4096))
+        return b"End of simulation" in file.read()
+
+
+def read_simulation(dig, finished=True):
+    """
+    Read the simulation files, which could be still written by Flow
+
+    Args:
+        dig (dict): Global dictionary\n
+        finished (bool): If False, then the errors from files being written are
+            ignored
+
+    Returns:
+        read (bool): True if the files were read
+
+    """
+    try:
+        if dig["use"] == "opm":
+            read_opm(dig)
+        else:
+            read_resdata(dig)
+    except (OSError, RuntimeError, ValueError, KeyError, IndexError):
+        if finished:
+            raise
+        return False
+    return True
 
 
 def read_times(dig):
@@ -340,13 +473,20 @@ def performance(dig):
     dil["map_sum"] = np.array(
         [time0 + int(np.floor(time / dig["sparse_t"])) for time in dil["times_det"]]
     )
+    # The CPU time starts again from zero in the resumed simulations
+    tcpu = tcpu + np.concatenate(
+        ([0], np.cumsum(np.where(tcpu[1:] < tcpu[:-1], tcpu[:-1], 0)))
+    )
+    if dig["time_initial"] > 0 and times[0] > 0:
+        # Restarted after the no-injection period (the summary starts afterwards)
+        tcpu = np.insert(tcpu, 0, 0)
     if dig["time_initial"] > 0:
         tcpu = tcpu[-len(dil["map_sum"]) - 1 :]
         tcpu = tcpu[1:] - tcpu[:-1]
     else:
         tcpu = tcpu[-len(dil["map_sum"]) :]
         tcpu[1:] -= tcpu[:-1]
-    if dig["time_initial"] == 0:
+    if times[0] > 0:
         times = np.insert(times, 0, 0)
         fgip = np.insert(fgip, 0, 0)
     interp_fgip = interp1d(
@@ -354,7 +494,8 @@ def performance(dig):
         fgip,
         fill_value="extrapolate",
     )
-    write_performance(dig, dil, interp_fgip, tcpu, infotimes)
+    with timer(dig, "csv"):
+        write_performance(dig, dil, interp_fgip, tcpu, infotimes)
 
 
 def write_performance(dig, dil, interp_fgip, tcpu, infotimes):
@@ -402,6 +543,7 @@ def write_performance(dig, dil, interp_fgip, tcpu, infotimes):
             + f"{np.sum(tcpu[itd]):.3e}, "
             + f"{np.sum(dil['tlinsols'][ind]):.3e}"
         )
+    dil["text"] += flow_usage(dig)
     with open(
         f"{dig['where']}/{dig['case']}_performance_time_series.csv",
         "w",
@@ -429,6 +571,7 @@ def write_performance(dig, dil, interp_fgip, tcpu, infotimes):
                 + f"{tcpu[j]:.3e}, "
                 + f"{np.sum(dil['tlinsols'][ind]):.3e}"
             )
+    dil["text"] += flow_usage(dig)
     with open(
         f"{dig['where']}/{dig['case']}_performance_time_series_detailed.csv",
         "w",
@@ -437,6 +580,34 @@ def write_performance(dig, dil, interp_fgip, tcpu, infotimes):
         file.write("\n".join(dil["text"]))
 
 
+def flow_usage(dig):
+    """
+    Comment line with the wall time, CPU time, peak resident memory, and exit status
+    of the Flow runs (written by pyopmspe11 in flow/usage.json)
+
+    Args:
+        dig (dict): Global dictionary
+
+    Returns:
+        text (list): Comment line (empty if there is no usage.json)
+
+    """
+    if not os.path.isfile(f"{dig['path']}/flow/usage.json"):
+        return []
+    with open(f"{dig['path']}/flow/usage.json", "r", encoding="utf8") as file:
+        usage = json.load(file)
+    return [
+        f"# flow runs = {len(usage['runs'])}, "
+        + ", ".join(
+            f"{name} = {usage[name]:.3e}"
+            if usage[name] is not None
+            else f"{name} = nan"
+            for name in ["wall [s]", "user [s]", "system [s]", "maxrss [MB]"]
+        )
+        + f", exit = {usage['exit']}"
+    ]
+
+
 def create_from_summary(dig, dil):
     """
     Use the summary arrays for the sparse data interpolation
@@ -579,16 +750,40 @@ def resdata_summary(dig, dil, names, sort):
             ) * KMOL_TO_KG
 
 
-def sparse_data(dig):
+def sparse_data(dig, dil=None):
     """
     Generate the sparse data within the benchmark format
 
     Args:
-        dig (dict): Global dictionary
+        dig (dict): Global dictionary\n
+        dil (dict): Local dictionary with the total variation of the concentration
+            in Box C, if already computed while following the simulation
 
     Returns:
         None
 
+    """
+    if dil is None:
+        dil = sparse_setup(dig)
+        # Using the restart data
+        with timer(dig, "unrst"):
+            compute_m_c(dig, dil)
+    with timer(dig, "summary"):
+        create_from_summary(dig, dil)
+    with timer(dig, "csv"):
+        write_sparse_data(dig, dil)
+
+
+def sparse_setup(dig):
+    """
+    Read the static quantities and set the groups for the sparse data
+
+    Args:
+        dig (dict): Global dictionary
+
+    Returns:
+        dil (dict): Local dictionary
+
     """
     dil = {
         "times_data": np.linspace(
@@ -622,10 +817,11 @@ def sparse_data(dig):
         dil[ent] = 0.0
     dil["m_c"] = []
     handle_fipnums(dig, dil)
-    create_from_summary(dig, dil)
-    # Using the restart data
-    compute_m_c(dig, dil)
-    write_sparse_data(dig, dil)
+    dil["boxc"] = np.array([fip in (4, 12, 17, 18) for fip in dil["fipnum"]])
+    dil["boxc_x"] = np.roll(dil["boxc"], 1)
+    dil["boxc_y"] = np.roll(dil["boxc"], -dig["gxyz"][0])
+    dil["boxc_z"] = np.roll(dil["boxc"], -dig["gxyz"][0] * dig["gxyz"][1])
+    return dil
 
 
 def handle_fipnums(dig, dil):
@@ -670,59 +866,81 @@ def compute_m_c(dig, dil):
         dil (dict): Modified local dictionary
 
     """
-    dil["boxc"] = np.array([fip in (4, 12, 17, 18) for fip in dil["fipnum"]])
-    dil["boxc_x"] = np.roll(dil["boxc"], 1)
-    dil["boxc_y"] = np.roll(dil["boxc"], -dig["gxyz"][0])
-    dil["boxc_z"] = np.roll(dil["boxc"], -dig["gxyz"][0] * dig["gxyz"][1])
     max_xcw(dig, dil)
     for t_n in range(dig["no_skip_rst"] + 1, dig["norst"]):
+        dil["m_c"].append(total_variation(dig, dil, t_n))
+
+
+def total_variation(dig, dil, t_n):
+    """
+    Total variation of the concentration field within Box C for one restart
+
+    Args:
+        dig (dict): Global dictionary\n
+        dil (dict): Local dictionary\n
+        t_n (int): Index for the number of restart file
+
+    Returns:
+        m_c (float): Total variation of the normalized CO2 mass fraction
+
+    """
+    dil["xcw"] = get_xcw(dig, t_n)
+    if dil["xcw_max"] > 0:
+        dil["xcw"] /= dil["xcw_max"]
+    if dil["xcw_max"] == -1:
         if dig["use"] == "opm":
-            rss = np.array(dig["unrst"][f"{dig['r_s'].upper()}", t_n])
+            rssat = np.array(dig["unrst"][f"{dig['r_s'].upper()}SAT", t_n])
         else:
-            rss = np.array(dig["unrst"][f"{dig['r_s'].upper()}"][t_n])
-        dil["xcw"] = np.divide(rss, rss + WAT_DEN_REF / GAS_DEN_REF)
-        if dil["xcw_max"] > 0:
-            dil["xcw"] /= dil["xcw_max"]
-        if dil["xcw_max"] == -1:
-            if dig["use"] == "opm":
-                rssat = np.array(dig["unrst"][f"{dig['r_s'].upper()}SAT", t_n])
-            else:
-                rssat = np.array(dig["unrst"][f"{dig['r_s'].upper()}SAT"][t_n])
-            x_l_co2_max = np.divide(rssat, rssat + WAT_DEN_REF / GAS_DEN_REF)
-            dil["xcw"] = np.divide(dil["xcw"], x_l_co2_max)
-        if dig["case"] != "spe11c":
-            dil["m_c"].append(
-                np.sum(
-                    np.abs(
-                        (dil["xcw"][dil["boxc_x"]] - dil["xcw"][dil["boxc"]])
-                        * dil["dz"][dil["boxc"]]
-                    )
-                    + np.abs(
-                        (dil["xcw"][dil["boxc_z"]] - dil["xcw"][dil["boxc"]])
-                        * dil["dx"][dil["boxc"]]
-                    )
-                )
+            rssat = np.array(dig["unrst"][f"{dig['r_s'].upper()}SAT"][t_n])
+        x_l_co2_max = np.divide(rssat, rssat + WAT_DEN_REF / GAS_DEN_REF)
+        dil["xcw"] = np.divide(dil["xcw"], x_l_co2_max)
+    if dig["case"] != "spe11c":
+        return np.sum(
+            np.abs(
+                (dil["xcw"][dil["boxc_x"]] - dil["xcw"][dil["boxc"]])
+                * dil["dz"][dil["boxc"]]
             )
-        else:
-            dil["m_c"].append(
-                np.sum(
-                    np.abs(
-                        (dil["xcw"][dil["boxc_x"]] - dil["xcw"][dil["boxc"]])
-                        * dil["dy"][dil["boxc"]]
-                        * dil["dz"][dil["boxc"]]
-                    )
-                    + np.abs(
-                        (dil["xcw"][dil["boxc_y"]] - dil["xcw"][dil["boxc"]])
-                        * dil["dx"][dil["boxc"]]
-                        * dil["dz"][dil["boxc"]]
-                    )
-                    + np.abs(
-                        (dil["xcw"][dil["boxc_z"]] - dil["xcw"][dil["boxc"]])
-                        * dil["dx"][dil["boxc"]]
-                        * dil["dy"][dil["boxc"]]
-                    )
-                )
+            + np.abs(
+                (dil["xcw"][dil["boxc_z"]] - dil["xcw"][dil["boxc"]])
+                * dil["dx"][dil["boxc"]]
             )
+        )
+    return np.sum(
+        np.abs(
+            (dil["xcw"][dil["boxc_x"]] - dil["xcw"][dil["boxc"]])
+            * dil["dy"][dil["boxc"]]
+            * dil["dz"][dil["boxc"]]
+        )
+        + np.abs(
+            (dil["xcw"][dil["boxc_y"]] - dil["xcw"][dil["boxc"]])
+            * dil["dx"][dil["boxc"]]
+            * dil["dz"][dil["boxc"]]
+        )
+        + np.abs(
+            (dil["xcw"][dil["boxc_z"]] - dil["xcw"][dil["boxc"]])
+            * dil["dx"][dil["boxc"]]
+            * dil["dy"][dil["boxc"]]
+        )
+    )
+
+
+def get_xcw(dig, t_n):
+    """
+    CO2 mass fraction in the liquid phase for one restart
+
+    Args:
+        dig (dict): Global dictionary\n
+        t_n (int): Index for the number of restart file
+
+    Returns:
+        xcw (array): Mass fraction in the simulation cells
+
+    """
+    if dig["use"] == "opm":
+        rss = np.array(dig["unrst"][f"{dig['r_s'].upper()}", t_n])
+    else:
+        rss = np.array(dig["unrst"][f"{dig['r_s'].upper()}"][t_n])
+    return np.divide(rss, rss + WAT_DEN_REF / GAS_DEN_REF)
 
 
 def write_sparse_data(dig, dil):
@@ -798,25 +1016,30 @@ def max_xcw(dig, dil):
         dil (dict): Modified local dictionary
 
     """
-    dil["xcw_max"] = 0
-    if dig["use"] == "opm":
-        if dig["unrst"].count(f"{dig['r_s'].upper()}SAT", 0):
-            dil["xcw_max"] = -1
-            return
-    else:
-        if dig["unrst"].has_kw(f"{dig['r_s'].upper()}SAT"):
-            dil["xcw_max"] = -1
-            return
+    dil["xcw_max"] = -1 if has_rssat(dig) else 0
+    if dil["xcw_max"] == -1:
+        return
     for t_n in range(dig["no_skip_rst"], dig["norst"]):
-        if dig["use"] == "opm":
-            rss = np.array(dig["unrst"][f"{dig['r_s'].upper()}", t_n])
-        else:
-            rss = np.array(dig["unrst"][f"{dig['r_s'].upper()}"][t_n])
-        xcw = np.divide(rss, rss + WAT_DEN_REF / GAS_DEN_REF)
-        xcw_max = np.max(xcw[dil["boxc"]])
+        xcw_max = np.max(get_xcw(dig, t_n)[dil["boxc"]])
         dil["xcw_max"] = max(xcw_max, dil["xcw_max"])
 
 
+def has_rssat(dig):
+    """
+    Check if the saturated dissolution ratio is in the restart files
+
+    Args:
+        dig (dict): Global dictionary
+
+    Returns:
+        rssat (bool): True if the restart files include RSSAT (or RSWSAT)
+
+    """
+    if dig["use"] == "opm":
+        return bool(dig["unrst"].count(f"{dig['r_s'].upper()}SAT", 0))
+    return bool(dig["unrst"].has_kw(f"{dig['r_s'].upper()}SAT"))
+
+
 def get_corners(dig, dil):
     """
     Get the cell corners from the simulation grid
@@ -829,49 +1052,61 @@ def get_corners(dig, dil):
         dil (dict): Modified local dictionary
 
     """
-    for i in ["x", "z"]:
-        dil[f"sim{i}cent"] = [0.0] * dig["noxz"]
-    with open(f"{dig['path']}/deck/centers.txt", "r", encoding="utf8") as file:
-        for j, row in enumerate(csv.reader(file)):
-            dil["simxcent"][j] = float(row[0])
-            dil["simzcent"][j] = dig["dims"][2] - float(row[2])
-            if dil["simzcent"][j] == 0:
-                dil["simxcent"][j] = -1e10
-                dil["simzcent"][j] = -1e10
-    dil["simpoly"] = []
-    with open(f"{dig['path']}/deck/corners.txt", "r", encoding="utf8") as file:
-        for row in csv.reader(file):
-            dil["simpoly"].append(
-                Polygon(
-                    [
-                        (float(row[0]), float(row[1])),
-                        (float(row[2]), float(row[3])),
-                        (float(row[4]), float(row[5])),
-                        (float(row[6]), float(row[7])),
-                    ]
-                )
-            )
+    if os.path.isfile(f"{dig['path']}/deck/centers.npy"):
+        centers = np.load(f"{dig['path']}/deck/centers.npy", mmap_mode="r")
+        corners = np.load(f"{dig['path']}/deck/corners.npy", mmap_mode="r")
+    else:
+        centers = np.loadtxt(f"{dig['path']}/deck/centers.txt", delimiter=",", ndmin=2)
+        corners = np.loadtxt(f"{dig['path']}/deck/corners.txt", delimiter=",", ndmin=2)
+    dil["simxcent"] = np.array(centers[:, 0])
+    dil["simzcent"] = dig["dims"][2] - centers[:, 2]
+    dil["simxcent"][dil["simzcent"] == 0] = -1e10
+    dil["simzcent"][dil["simzcent"] == 0] = -1e10
+    dil["simpoly"] = list(polygons(np.reshape(corners, (-1, 4, 2))))
     if dig["use"] == "opm":
         dil["satnum"] = list(dig["init"]["SATNUM"])
     else:
         dil["satnum"] = list(dig["init"].iget_kw("SATNUM")[0])
 
 
-def dense_data(dig):
+def dense_data(dig, dil=None):
     """
     Generate the dense data within the benchmark format
 
     Args:
-        dig (dict): Global dictionary
+        dig (dict): Global dictionary\n
+        dil (dict): Local dictionary with the mapping to the reporting grid, if the
+            dense data were already written while following the simulation
 
     Returns:
         None
 
+    """
+    if dil is None:
+        dil = dense_mapping(dig)
+        if dig["mode"] == "all" or dig["mode"][:5] == "dense":
+            for i in range(dil["nrstno"]):
+                dense_step(dig, dil, i)
+    if dig["mode"] in ["all", "performance-spatial", "dense_performance-spatial"]:
+        handle_performance_spatial(dig, dil)
+
+
+def dense_mapping(dig):
+    """
+    Map the simulation grid to the reporting grid for the dense data
+
+    Args:
+        dig (dict): Global dictionary
+
+    Returns:
+        dil (dict): Local dictionary
+
     """
     dil = {"rstno": []}
     for time in dig["dense_t"]:
         dil["rstno"].append(dig["times"].index(time))
-    get_corners(dig, dil)
+    with timer(dig, "corners"):
+        get_corners(dig, dil)
     dil["nrstno"] = len(dil["rstno"])
     for i, j, k in zip(["x", "y", "z"], dig["dims"], dig["nxyz"]):
         dil[f"ref{i}vert"] = np.linspace(0, j, k + 1)
@@ -919,18 +1154,33 @@ def dense_data(dig):
     if dig["case"] == "spe11c":
         handle_yaxis_mapping_intensive(dig, dil)
         handle_yaxis_mapping_extensive(dig, dil)
-    if dig["mode"] == "all" or dig["mode"][:5] == "dense":
-        names = ["pressure", "sgas", "xco2", "xh20", "gden", "wden", "tco2"]
-        if dig["case"] != "spe11a":
-            names = ["temp"] + names
-        for i, rst in enumerate(dil["rstno"]):
-            print(f"Processing dense data {i+1} out of {dil['nrstno']}")
-            t_n = rst + dig["no_skip_rst"]
-            generate_arrays(dig, dil, names, t_n)
-            map_to_report_grid(dig, dil, names)
-            write_dense_data(dig, dil, i)
-    if dig["mode"] in ["all", "performance-spatial", "dense_performance-spatial"]:
-        handle_performance_spatial(dig, dil)
+    dil["names"] = ["pressure", "sgas", "xco2", "xh20", "gden", "wden", "tco2"]
+    if dig["case"] != "spe11a":
+        dil["names"] = ["temp"] + dil["names"]
+    return dil
+
+
+def dense_step(dig, dil, i):
+    """
+    Write the dense data for one of the times
+
+    Args:
+        dig (dict): Global dictionary\n
+        dil (dict): Local dictionary\n
+        i (int): Index of the time for the dense data
+
+    Returns:
+        None
+
+    """
+    print(f"Processing dense data {i+1} out of {dil['nrstno']}")
+    t_n = dil["rstno"][i] + dig["no_skip_rst"]
+    with timer(dig, "unrst"):
+        generate_arrays(dig, dil, dil["names"], t_n)
+    with timer(dig, "mapping"):
+        map_to_report_grid(dig, dil, dil["names"])
+    with timer(dig, "csv"):
+        write_dense_data(dig, dil, i)
 
 
 def handle_yaxis_mapping_extensive(dig, dil):
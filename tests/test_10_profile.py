@@ -0,0 +1,25 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the cProfile files of the stages"""
+
+import os
+import pstats
+import subprocess
+
+
+def test_profile():
+    """See configs/spe11c.txt"""
+    cwd = os.getcwd()
+    os.chdir(f"{os.getcwd()}/tests/configs")
+    subprocess.run(
+        "pyopmspe11 -i spe11c.txt -o spe11c_profile -m deck -r 24,3,12 -p 1".split(),
+        check=True,
+    )
+    for stage in ["grid", "positions", "opm_files"]:
+        fname = f"{os.getcwd()}/spe11c_profile/profiles/{stage}"
+        stats = pstats.Stats(f"{fname}.pstats")
+        with open(f"{fname}.collapsed", "r", encoding="utf8") as file:
+            total = sum(int(row.rsplit(" ", 1)[1]) for row in file)
+        assert abs(total - stats.total_tt * 1e6) < 0.1 * stats.total_tt * 1e6  # type: ignore
+    os.chdir(cwd)
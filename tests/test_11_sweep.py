@@ -0,0 +1,25 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the decks of several configuration files written concurrently"""
+
+import os
+import csv
+import subprocess
+
+
+def test_sweep():
+    """See configs/input.txt and configs/spe11c.txt"""
+    cwd = os.getcwd()
+    os.chdir(f"{os.getcwd()}/tests/configs")
+    subprocess.run(
+        "pyopmspe11 -i input.txt,spe11c.txt -o sweep -m deck -r 24,3,12 -n 2".split(),
+        check=True,
+    )
+    with open(f"{os.getcwd()}/sweep/sweep.csv", "r", encoding="utf8") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["config"] for row in rows] == ["input", "spe11c"]
+    assert all(row["status"] == "done" for row in rows)
+    for name in ["input", "spe11c"]:
+        assert os.path.isfile(f"{os.getcwd()}/sweep/{name}/deck/{name.upper()}.DATA")
+    os.chdir(cwd)
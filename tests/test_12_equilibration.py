@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the deck restarting after the no-injection period and the UNRST stitching"""
+
+import os
+import subprocess
+from pyopmspe11.utils.restart import (
+    equilibration_cache,
+    report_steps,
+    stitch_restarts,
+)
+
+
+def test_equilibration():
+    """See configs/input.txt"""
+    cwd = os.getcwd()
+    os.chdir(f"{os.getcwd()}/tests/configs")
+    subprocess.run(
+        "pyopmspe11 -i input.txt -o equilibration -m deck -e 1".split(), check=True
+    )
+    with open(f"{os.getcwd()}/equilibration/deck/EQUILIBRATION.DATA", "rb") as file:
+        deck = file.read().decode("utf8")
+    with open(f"{os.getcwd()}/equilibration/deck/EQUIL.DATA", "rb") as file:
+        equil = file.read().decode("utf8")
+    assert "RESTART\n'EQUIL'" in deck and "SKIPREST" in deck
+    assert "RESTART" not in equil and "EQUIL\n" in equil
+    # The cache key depends only on the files included in EQUIL.DATA
+    dic = {"exe": os.getcwd(), "fol": "equilibration", "cache": "cache"}
+    equilibration_cache(dic)
+    key = dic["equil_cache"]
+    with open(f"{os.getcwd()}/equilibration/deck/STALE.INC", "w", encoding="utf8"):
+        pass
+    equilibration_cache(dic)
+    assert dic["equil_cache"] == key
+    with open(
+        f"{os.getcwd()}/equilibration/deck/PORO.INC", "a", encoding="utf8"
+    ) as file:
+        file.write("\n")
+    equilibration_cache(dic)
+    assert dic["equil_cache"] != key
+    os.chdir(cwd)
+
+
+def write_unrst(fname, seqnums):
+    """Write a small UNRST file with one SEQNUM and one PRESSURE per report step"""
+    with open(fname, "wb") as file:
+        for seqnum in seqnums:
+            for name, kind, values in [
+                (b"SEQNUM  ", b"INTE", [seqnum]),
+                (b"PRESSURE", b"REAL", [seqnum] * 3),
+            ]:
+                for data in [
+                    name + len(values).to_bytes(4, "big") + kind,
+                    b"".join(value.to_bytes(4, "big") for value in values),
+                ]:
+                    size = len(data).to_bytes(4, "big")
+                    file.write(size + data + size)
+
+
+def test_stitch(tmp_path):
+    """The steps of the base file before the continued ones are kept"""
+    write_unrst(f"{tmp_path}/BASE.UNRST", [0, 1, 2])
+    write_unrst(f"{tmp_path}/CONT.UNRST", [2, 3])
+    write_unrst(f"{tmp_path}/FULL.UNRST", [0, 1, 2, 3])
+    stitch_restarts(
+        f"{tmp_path}/BASE.UNRST", f"{tmp_path}/CONT.UNRST", f"{tmp_path}/CONT.UNRST"
+    )
+    assert [step[0] for step in report_steps(f"{tmp_path}/CONT.UNRST")] == [0, 1, 2, 3]
+    with open(f"{tmp_path}/CONT.UNRST", "rb") as file:
+        stitched = file.read()
+    with open(f"{tmp_path}/FULL.UNRST", "rb") as file:
+        assert stitched == file.read()
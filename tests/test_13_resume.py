@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the restart deck and the stitching of the outputs of a resumed simulation"""
+
+import os
+import struct
+import subprocess
+from pyopmspe11.utils.restart import (
+    keywords,
+    report_steps,
+    restart_deck,
+    stitch_infosteps,
+    stitch_summaries,
+)
+
+
+def test_restart_deck():
+    """The restart deck matches the template after the no-injection period"""
+    cwd = os.getcwd()
+    os.chdir(f"{os.getcwd()}/tests/configs")
+    for name, flag in [("resume", "0"), ("resume_equil", "1")]:
+        subprocess.run(
+            ["pyopmspe11", "-i", "input.txt", "-o", name, "-m", "deck", "-e", flag],
+            check=True,
+        )
+    with open(f"{os.getcwd()}/resume_equil/deck/RESUME_EQUIL.DATA", "rb") as file:
+        deck = file.read().decode("utf8")
+    step = int(deck.split("\nRESTART\n'EQUIL' ")[1].split()[0])
+    restart_deck(
+        f"{os.getcwd()}/resume/deck/RESUME.DATA",
+        f"{os.getcwd()}/resume/deck/RESTART.DATA",
+        "EQUIL",
+        step,
+    )
+    with open(f"{os.getcwd()}/resume/deck/RESTART.DATA", "rb") as file:
+        assert file.read().decode("utf8").split("\n", 1)[1] == deck
+    os.chdir(cwd)
+
+
+def write_keywords(fname, entries):
+    """Write a binary file with the given keywords (name, type, and values)"""
+    with open(fname, "wb") as file:
+        for name, kind, values in entries:
+            fmt = {b"INTE": ">i", b"REAL": ">f", b"CHAR": "8s"}[kind]
+            for data in [
+                f"{name:<8}".encode() + len(values).to_bytes(4, "big") + kind,
+                b"".join(struct.pack(fmt, value) for value in values),
+            ]:
+                size = len(data).to_bytes(4, "big")
+                file.write(size + data + size)
+
+
+def summary(case, times):
+    """Write the SMSPEC and UNSMRY files with one ministep per report step"""
+    write_keywords(
+        f"{case}.SMSPEC",
+        [("KEYWORDS", b"CHAR", [b"TIME    ", b"TCPU    "]), ("NUMS", b"INTE", [0, 0])],
+    )
+    values = []
+    for i, time in enumerate(times):
+        values += [("SEQHDR", b"INTE", [i]), ("MINISTEP", b"INTE", [i])]
+        values.append(("PARAMS", b"REAL", [time, 1.0 + i]))
+    write_keywords(f"{case}.UNSMRY", values)
+
+
+def test_stitch(tmp_path):
+    """An interrupted simulation continued from its last complete report step"""
+    steps = [("SEQNUM", b"INTE", [0]), ("PRESSURE", b"REAL", [1.0, 2.0])]
+    steps += [("SEQNUM", b"INTE", [1]), ("PRESSURE", b"REAL", [1.0, 2.0])]
+    write_keywords(f"{tmp_path}/BASE.UNRST", steps + [("SEQNUM", b"INTE", [2])])
+    with open(f"{tmp_path}/BASE.UNRST", "ab") as file:
+        file.write(b"\x00\x00\x00\x10PRESSURE")
+    steps = report_steps(f"{tmp_path}/BASE.UNRST", True)
+    assert [step[0] for step in steps] == [0, 1]
+    summary(f"{tmp_path}/BASE", [1.0, 2.0, 3.0])
+    summary(f"{tmp_path}/CONT", [3.0, 4.0])
+    stitch_summaries(f"{tmp_path}/BASE", f"{tmp_path}/CONT", f"{tmp_path}/BASE")
+    params = [
+        struct.unpack(">2f", data)
+        for name, _, _, data in keywords(f"{tmp_path}/BASE.UNSMRY", ["PARAMS"])
+        if name == "PARAMS"
+    ]
+    assert params == [(1.0, 1.0), (2.0, 2.0), (3.0, 1.0), (4.0, 2.0)]
+    for name, rows in [("BASE", ["1 1", "2 1", "3 1", "3.5"]), ("CONT", ["3 1"])]:
+        with open(f"{tmp_path}/{name}.INFOSTEP", "w", encoding="utf8") as file:
+            file.write("\n".join(["Time(day) TStep(day)"] + rows) + "\n")
+    stitch_infosteps(
+        f"{tmp_path}/BASE.INFOSTEP",
+        f"{tmp_path}/CONT.INFOSTEP",
+        f"{tmp_path}/BASE.INFOSTEP",
+    )
+    with open(f"{tmp_path}/BASE.INFOSTEP", "r", encoding="utf8") as file:
+        assert file.read().splitlines()[1:] == ["1 1", "2 1", "3 1"]
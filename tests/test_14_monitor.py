@@ -0,0 +1,30 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the progress of a simulation from the rows of its INFOSTEP file"""
+
+import json
+import time
+from pyopmspe11.utils.monitor import update, write_status
+
+
+def test_monitor(tmp_path):
+    """Two updates, with a failed time step in the second one"""
+    status = {"deck": "SPE11B", "state": "running", "steps": 0, "failed_steps": 0}
+    status.update({"newton_iterations": 0, "linear_iterations": 0})
+    status.update({"end [d]": 100.0, "time [d]": 0.0, "progress [%]": 0.0})
+    status.update({"rate [y/h]": None, "failed_rate [-]": None, "eta": None})
+    info = {"begin": time.time(), "offset": 0, "first": None, "old": None}
+    header = "Time(day) TStep(day) Assembly(s) LinearSolve(s) LinSolve(s) Update(s) "
+    header += "Output(s) Total(s) NewtIt LinIt Conv Success"
+    update(status, info, [header, "0 10 0 0 0 0 0 1 2 4 20 1"])
+    assert status["progress [%]"] == 10.0 and status["rate [y/h]"] is None
+    info.update(first=[time.time() - 3600.0, 10.0])  # First row one hour ago
+    update(status, info, ["10 10 0 0 0 0 0 1 2 8 40 0", "10 5 0 0 0 0 0 1 2 4 20 1"])
+    assert status["steps"] == 3 and status["failed_steps"] == 1
+    assert status["newton_iterations"] == 16 and status["linear_iterations"] == 80
+    assert status["progress [%]"] == 15.0
+    assert abs(status["rate [y/h]"] * 365.25 - 5.0) < 1e-2
+    write_status({"exe": f"{tmp_path}", "fol": "."}, status)
+    with open(f"{tmp_path}/status.json", "r", encoding="utf8") as file:
+        assert json.load(file)["eta"] == status["eta"]
@@ -0,0 +1,24 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the resource usage written for the Flow runs"""
+
+import os
+import json
+from pyopmspe11.utils.runs import run_flow
+
+
+def test_usage(tmp_path):
+    """A command allocating 100 MB and exiting with an error instead of Flow"""
+    os.makedirs(f"{tmp_path}/usage/flow")
+    dic = {"exe": f"{tmp_path}", "fol": "usage"}
+    dic["flow"] = "python3 -c 'import sys; data = bytearray(10**8); sys.exit(3)'"
+    for deck in ["USAGE", "RESUME"]:
+        run_flow(dic, deck, "flow")
+    with open(f"{tmp_path}/usage/flow/usage.json", "r", encoding="utf8") as file:
+        usage = json.load(file)
+    assert [run["deck"] for run in usage["runs"]] == ["USAGE", "RESUME"]
+    assert usage["exit"] == 3
+    if usage["maxrss [MB]"] is not None:
+        assert usage["maxrss [MB]"] >= 100.0
+        assert usage["user [s]"] == sum(run["user [s]"] for run in usage["runs"])
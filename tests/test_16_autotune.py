@@ -0,0 +1,49 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the flags, schedule, and scores of the trial simulations"""
+
+import os
+import json
+from pyopmspe11.utils.autotune import merge_flags, score, trial_schedule
+
+
+def test_trials(tmp_path):
+    """Two trials, where the second one has one failed time step"""
+    flow = "mpirun -np 4 flow --linear-solver=cprw --enable-tuning=true"
+    flow = merge_flags(flow, "--linear-solver=cpr_trueimpes --nonlinear-solver=nldd")
+    assert flow == (
+        "mpirun -np 4 flow --linear-solver=cpr_trueimpes --enable-tuning=true "
+        "--nonlinear-solver=nldd"
+    )
+    dic = {"exe": f"{tmp_path}", "fol": ".", "time": 86400.0, "autotune": 12.0}
+    dic["inj"] = [[100.0 * 86400.0, 100.0 * 86400.0, 0, 1, 0, 10, 1, 0, 10]]
+    dic["inj"] += [[50.0 * 86400.0, 5.0 * 86400.0, 0, 1, 1, 10, 1, 0, 10]]
+    schedule = trial_schedule(dic, 1)
+    assert [inj[:2] for inj in schedule] == [
+        [100.0 * 86400.0, 100.0 * 86400.0],
+        [10.0 * 86400.0, 5.0 * 86400.0],
+    ]
+    header = "Time(day) TStep(day) Assembly(s) LinearSolve(s) LinSolve(s) Update(s) "
+    header += "Output(s) Total(s) NewtIt LinIt Conv Success"
+    trials = []
+    for i, rows in enumerate(
+        [
+            ["100 5 0 0 0 0 0 1 2 4 20 1", "105 5 0 0 0 0 0 1 2 4 20 1"],
+            ["100 10 0 0 0 0 0 1 2 8 40 0", "100 10 0 0 0 0 0 1 2 4 20 1"],
+        ]
+    ):
+        trials.append({"deck": f"TUNE{i}", "folder": f"autotune/TUNE{i}"})
+        trials[-1].update({"start [d]": 100.0, "end [d]": 110.0})
+        os.makedirs(f"{tmp_path}/autotune/TUNE{i}")
+        with open(
+            f"{tmp_path}/autotune/TUNE{i}/usage.json", "w", encoding="utf8"
+        ) as file:
+            json.dump({"exit": 0, "wall [s]": 2.0}, file)
+        with open(
+            f"{tmp_path}/autotune/TUNE{i}/TUNE{i}.INFOSTEP", "w", encoding="utf8"
+        ) as file:
+            file.write("\n".join([header] + rows) + "\n")
+        score(dic, trials[-1])
+    assert trials[0]["score [d/s]"] == 5.0 and trials[1]["score [d/s]"] == 2.5
+    assert trials[1]["failed_steps"] == 1 and trials[1]["newton_iterations"] == 12
@@ -0,0 +1,29 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the repeat counts (n*value) of the values written in the INC files"""
+
+import io
+import numpy as np
+from pyopmspe11.utils.writefile import write_values
+
+
+def expand(text):
+    """Expand the repeat counts as OPM does when reading the keyword values"""
+    values = []
+    for item in text.split():
+        count, value = item.split("*") if "*" in item else (1, item)
+        values += [float(value)] * int(count)
+    return values
+
+
+def test_values():
+    """Integers and floats, split in chunks of two runs"""
+    for values in [
+        np.array([1, 1, 1, 2, 3, 3, 1, 1, 7]),
+        np.array([0.1, 0.1, 1e-12, 2.5e3, 2.5e3, 2.5e3, 0.1, 1 / 3]),
+    ]:
+        file = io.StringIO()
+        write_values(file, values, chunk=2)
+        assert expand(file.getvalue()) == values.tolist()
+    assert file.getvalue().splitlines()[:2] == ["2*0.1", "1e-12"]
@@ -4,6 +4,7 @@
 """Test the spe11b case"""
 
 import os
+import json
 from pyopmspe11.core.pyopmspe11 import main
 
 
@@ -14,3 +15,7 @@ def test_spe11b():
     main()
     os.chdir(cwd)
     assert os.path.exists(f"{cwd}/tests/configs/output/flow/OUTPUT.UNRST")
+    with open(f"{cwd}/tests/configs/output/timings.json", encoding="utf8") as file:
+        stages = [record["stage"] for record in json.load(file)["stages"]]
+    for stage in ["grid", "positions/facies", "opm_files/grid", "simulations"]:
+        assert stage in stages
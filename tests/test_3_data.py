@@ -4,6 +4,10 @@
 """Test the scrip to write the data as required in the benchmark"""
 
 import os
+import sys
+import inspect
+import filecmp
+import subprocess
 from pyopmspe11.visualization.data import main
 
 
@@ -15,3 +19,22 @@ def test_data():
     main()
     assert os.path.exists(f"{cwd}/tests/configs/output/data/spe11b_time_series.csv")
     os.chdir(cwd)
+
+
+def test_follow():
+    """See visualization/data.py (the simulation in output already finished)"""
+    cwd = os.getcwd()
+    os.chdir(f"{cwd}/tests/configs")
+    os.rename("output/data", "output/data_batch")
+    os.mkdir("output/data")
+    subprocess.run(
+        [sys.executable, inspect.getfile(main), "-f", "1"],
+        check=True,
+    )
+    assert filecmp.cmp(
+        "output/data/spe11b_time_series.csv",
+        "output/data_batch/spe11b_time_series.csv",
+        shallow=False,
+    )
+    os.system("rm -rf output/data && mv output/data_batch output/data")
+    os.chdir(cwd)
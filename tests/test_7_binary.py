@@ -0,0 +1,42 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the binary IMPORT files against the text INCLUDE files"""
+
+import os
+import subprocess
+import numpy as np
+from opm.io.parser import Parser
+from opm.io.ecl_state import EclipseState
+
+
+def test_binary():
+    """See configs/spe11c.txt"""
+    cwd = os.getcwd()
+    os.chdir(f"{os.getcwd()}/tests/configs")
+    for binary in ["0", "1"]:
+        subprocess.run(
+            f"pyopmspe11 -i spe11c.txt -o spe11c_binary{binary} -m deck "
+            f"-r 24,3,12 -b {binary}".split(),
+            check=True,
+        )
+    states = [
+        EclipseState(
+            Parser().parse(
+                f"{cwd}/tests/configs/spe11c_binary{binary}/deck/SPE11C_BINARY{binary}.DATA"
+            )
+        )
+        for binary in ["0", "1"]
+    ]
+    assert states[0].grid().nactive == states[1].grid().nactive
+    for name in ["PERMX", "PORO", "THCONR"]:
+        assert np.array_equal(
+            states[0].field_props().get_double_array(name),
+            states[1].field_props().get_double_array(name),
+        )
+    for name in ["SATNUM", "FIPNUM"]:
+        assert np.array_equal(
+            states[0].field_props().get_int_array(name),
+            states[1].field_props().get_int_array(name),
+        )
+    os.chdir(cwd)
@@ -0,0 +1,54 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the decks written from the grid cache against the ones without it"""
+
+import os
+import glob
+import filecmp
+import subprocess
+
+
+def test_cache():
+    """See configs/input.txt"""
+    cwd = os.getcwd()
+    os.chdir(f"{os.getcwd()}/tests/configs")
+    env = dict(os.environ, XDG_CACHE_HOME=f"{os.getcwd()}/cache")
+    os.system(f"rm -rf {os.getcwd()}/cache")
+    for name in ["cold", "warm"]:
+        subprocess.run(
+            ["pyopmspe11", "-i", "input.txt", "-o", f"cache_{name}", "-m", "deck"],
+            env=env,
+            check=True,
+        )
+    assert os.listdir(f"{os.getcwd()}/cache/pyopmspe11")
+    for name in ["GRID.INC", "centers.npy", "corners.npy", "PVBOUNDARIES.INC"]:
+        assert filecmp.cmp(
+            f"{os.getcwd()}/cache_cold/deck/{name}",
+            f"{os.getcwd()}/cache_warm/deck/{name}",
+            shallow=False,
+        )
+    os.chdir(cwd)
+
+
+def test_partial_cache():
+    """A truncated facies cache is built again"""
+    cwd = os.getcwd()
+    os.chdir(f"{os.getcwd()}/tests/configs")
+    env = dict(os.environ, XDG_CACHE_HOME=f"{os.getcwd()}/cache")
+    os.system(f"rm -rf {os.getcwd()}/cache")
+    args = ["pyopmspe11", "-i", "input.txt", "-o", "cache_partial", "-m", "deck"]
+    subprocess.run(args, env=env, check=True)
+    with open(f"{os.getcwd()}/cache_partial/deck/SATNUM.INC", "rb") as file:
+        satnum = file.read()
+    (cache,) = glob.glob(f"{os.getcwd()}/cache/pyopmspe11/facies_*.npz")
+    size = os.path.getsize(cache)
+    with open(cache, "r+b") as file:
+        file.truncate(size // 2)
+    prosc = subprocess.run(args, env=env, check=True, capture_output=True, text=True)
+    assert "is not valid, building it again" in prosc.stdout
+    assert os.path.getsize(cache) == size
+    assert not glob.glob(f"{os.getcwd()}/cache/pyopmspe11/*.npz.*")
+    with open(f"{os.getcwd()}/cache_partial/deck/SATNUM.INC", "rb") as file:
+        assert file.read() == satnum
+    os.chdir(cwd)
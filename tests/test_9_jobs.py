@@ -0,0 +1,31 @@
+# SPDX-FileCopyrightText: 2024 NORCE
+# SPDX-License-Identifier: MIT
+
+"""Test the spe11c grid written with several processes against one process"""
+
+import os
+import filecmp
+import subprocess
+
+
+def test_jobs():
+    """See configs/spe11c.txt"""
+    cwd = os.getcwd()
+    os.chdir(f"{os.getcwd()}/tests/configs")
+    for jobs in ["1", "3"]:
+        subprocess.run(
+            f"pyopmspe11 -i spe11c.txt -o spe11c_jobs{jobs} -m deck "
+            f"-r 24,3,12 -j {jobs}".split(),
+            check=True,
+        )
+    assert filecmp.cmp(
+        f"{os.getcwd()}/spe11c_jobs1/deck/GRID.INC",
+        f"{os.getcwd()}/spe11c_jobs3/deck/GRID.INC",
+        shallow=False,
+    )
+    assert not [
+        name
+        for name in os.listdir(f"{os.getcwd()}/spe11c_jobs3/deck")
+        if name.startswith("GRID.INC.")
+    ]
+    os.chdir(cwd)